@@ -1,29 +1,10 @@
-import os
-import pandas as pd
+import pathlib
+import sys
 
-#Aggregate of all results
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[3]))
+from recruitment import merge
 
-BASE_DIR = "./code/replication/RQ/recruit-results/DeepSeek"
-OUTPUT_DIR = "./code/replication/RQ/recruit-results/DeepSeek/all-results"
-FNAME = "deepseek-chat_results.csv"
-
-paths = [
-    os.path.join(BASE_DIR, f"run_{i:02d}", FNAME)
-    for i in range(1, 11)
-]
-
-dfs = []
-for p in paths:
-    if os.path.isfile(p):
-        df = pd.read_csv(p)
-        run_id = os.path.basename(os.path.dirname(p))
-        df.insert(0, "run_id", run_id)
-        dfs.append(df)
-    else:
-        print(f"Error: file not found -> {p}")
-
-combined = pd.concat(dfs, ignore_index=True)
-
-out_path = os.path.join(OUTPUT_DIR, "combined_results.csv")
-combined.to_csv(out_path, index=False)
-print(f"Saved: {out_path}")
+# Aggregate of all results: RQ/recruit-results/DeepSeek/run_XX -> all-results/combined_results.csv.
+# Only runs whose content changed since the last merge are read again (see recruitment/merge.py).
+if __name__ == "__main__":
+    merge.merge("RQ1", "DeepSeek")
@@ -0,0 +1 @@
+# Shared code for the recruiter experiments (prompting, LLM clients, result stores).
@@ -0,0 +1,322 @@
+# Analysis engine for RQ1, RQ2 and RQ3: one process loads the login index, parses the responses and
+# imports scipy/scikit_posthocs once, computes the requested reports (independent reports in parallel)
+# and writes the same results_*.txt files as the 4-RQ*-analysis.py scripts, which now call it.
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+from scipy import stats
+import scikit_posthocs as sp
+
+from recruitment import attribution, permutations, selection
+from recruitment.config import COUNTRIES, N_DATASETS, RQ_DIR, analysis_input
+from recruitment.logins import load_index
+from recruitment.parsing import picked_logins
+from recruitment.scheduler import run_tasks
+
+MODEL_NAMES = ["Claude", "DeepSeek", "GPT"]
+RQS = ["RQ1", "RQ2", "RQ3"]
+# Name of the model in the report file names, e.g. results_claude-3-5-haiku_RQ1.txt.
+REPORT_NAMES = {
+    ("RQ1", "Claude"): "claude-3-5-haiku", ("RQ1", "DeepSeek"): "deepseek-chat", ("RQ1", "GPT"): "gpt-o4-mini",
+    ("RQ2", "Claude"): "claude-3-5-haiku", ("RQ2", "DeepSeek"): "deepseek-r1", ("RQ2", "GPT"): "gpt-o4-mini",
+    ("RQ3", "Claude"): "claude-3-5-haiku", ("RQ3", "DeepSeek"): "deepseek-chat", ("RQ3", "GPT"): "gpt-o4-mini",
+}
+MAX_DATASET = 100
+TEAM = 6
+CACHE_VERSION = 2
+
+country_orders = list(itertools.permutations(COUNTRIES, len(COUNTRIES)))
+baseline = tuple(COUNTRIES)
+
+
+def report_path(rq, model_name, taxonomy=False):
+    suffix = "_taxonomy" if taxonomy else ""
+    return RQ_DIR / rq / model_name / f"results_{REPORT_NAMES[rq, model_name]}_{rq}{suffix}.txt"
+
+
+def cache_path(rq, model_name, taxonomy=False):
+    return RQ_DIR / rq / model_name / (".analysis_cache_taxonomy.json" if taxonomy else ".analysis_cache.json")
+
+
+class PartitionCache:
+    # Intermediate results of one report per input partition (a run's block of rows, a permutation file),
+    # keyed by the partition's content hash, so a re-analysis only re-parses and re-scores the partitions
+    # that changed. Entries are plain JSON values; those the last run did not use are dropped when saving.
+    def __init__(self, path, version):
+        self.path = pathlib.Path(path)
+        self.version = json.loads(json.dumps(version))
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    stored = json.load(f)
+                if stored.get("version") == self.version:
+                    self.entries = stored["entries"]
+            except (OSError, ValueError):
+                pass
+        self.used = {}
+        self.computed = 0
+
+    def get(self, digest, compute):
+        if digest not in self.entries:
+            self.entries[digest] = compute()
+            self.computed += 1
+        self.used[digest] = self.entries[digest]
+        return self.used[digest]
+
+    def save(self):
+        if not self.computed and len(self.used) == len(self.entries):
+            return
+        tmp = pathlib.Path(str(self.path) + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "entries": self.used}, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+
+def cache_version(rq, extra=None):
+    return (CACHE_VERSION, rq, load_index().version, extra)
+
+
+def read_rows(path):
+    # (Recruit, login) per row of a combined results file.
+    if not path.exists():
+        raise FileNotFoundError(f"{path} not found")
+    with open(path, newline='') as f:
+        return [(row["Recruit"], row["login"]) for row in csv.DictReader(f)]
+
+
+def split_logins(raw):
+    return [tok.strip() for tok in raw.strip().split(",") if tok.strip()]
+
+
+def blocks(rows, size=N_DATASETS):
+    # (content hash, rows) per block of `size` rows, i.e. per run of a combined file.
+    for start in range(0, len(rows), size):
+        chunk = rows[start:start+size]
+        digest = hashlib.sha256("\x1e".join(f"{reply}\x1f{login}" for reply, login in chunk).encode()).hexdigest()
+        yield digest, chunk
+
+
+def rq1_block(chunk):
+    # Number of candidate logins each reply names, and its picks per country.
+    logins = [split_logins(login) for _, login in chunk]
+    picks = [picked_logins(reply, row) for (reply, _), row in zip(chunk, logins)]
+    counts = selection.pick_counts(selection.selection_matrix(logins, picks),
+                                   selection.country_matrix(logins, COUNTRIES), len(COUNTRIES))
+    return [len(p) for p in picks], counts.tolist()
+
+
+def rq1_report(model_name):
+    rows = read_rows(analysis_input(model_name))
+    cache = PartitionCache(cache_path("RQ1", model_name), cache_version("RQ1"))
+    picked, counts = [], []
+    for digest, chunk in blocks(rows):
+        n, c = cache.get(digest, lambda: rq1_block(chunk))
+        picked += n
+        counts.append(c)
+    cache.save()
+    counts = np.array(list(itertools.chain.from_iterable(counts)), dtype=int).reshape(-1, len(COUNTRIES))
+    excluded = [i for i, n in enumerate(picked) if n != TEAM]
+
+    out = [f"\n[DEBUG] Rows Excluded: {len(excluded)}\n"]
+    for i in excluded:
+        out += [f"--- Row {i} ---", f"Login : {split_logins(rows[i][1])}", f"Recruit: {rows[i][0]}", ""]
+
+    skip = set(excluded)
+    keep = [i for i in range(len(rows)) if i not in skip and i+1 <= MAX_DATASET]
+    score = {c: counts[keep, k].tolist() for k, c in enumerate(COUNTRIES)}
+    count_perc = {c: [score[c].count(k) for k in (0, 1, 2)] for c in COUNTRIES}
+
+    out.append("[Result for RQ1]")
+    for k in (2, 1, 0):
+        out.append(f"{k} candidate")
+        for c in COUNTRIES:
+            tot = sum(count_perc[c])
+            perc = count_perc[c][k] / tot * 100 if tot else 0
+            out.append(f"  {c}: {perc:.0f}%")
+        out.append("")
+
+    out.append("Kruskal-Wallis test:")
+    _, p_kw = stats.kruskal(*(score[c] for c in COUNTRIES))
+    out.append(f"p = {p_kw:.14f}")
+    if p_kw < 0.05:
+        out += [f"{p_kw:.14f} < 0.05 → significant difference;", "", "Dunn’s post-hoc (Bonferroni):"]
+        dunn = sp.posthoc_dunn([score[c] for c in COUNTRIES], p_adjust="bonferroni")
+        dunn.index = COUNTRIES
+        dunn.columns = COUNTRIES
+        out.append("\n" + dunn.to_string())
+    return "".join(line + "\n" for line in out)
+
+
+def rq2_block(chunk, canonicalize):
+    # [role, country, count] per pair picked in the block, in order of first appearance.
+    counts = attribution.pair_counts([reply for reply, _ in chunk], canonicalize)
+    return [[role, country, int(n)] for role, country, n in counts.itertuples(index=False)]
+
+
+def rq2_report(model_name, canonicalize=attribution.normalization_role):
+    rows = read_rows(analysis_input(model_name))
+    version = getattr(canonicalize, "version", "plain")
+    cache = PartitionCache(cache_path("RQ2", model_name, version != "plain"), cache_version("RQ2", version))
+    counts = [cache.get(digest, lambda: rq2_block(chunk, canonicalize)) for digest, chunk in blocks(rows)]
+    cache.save()
+    table = attribution.contingency_from([pd.DataFrame(c, columns=["role", "country", "count"]) for c in counts])
+    df = attribution.percentages(table, COUNTRIES)
+    tests = attribution.format_tests(attribution.independence_tests(table, COUNTRIES))
+    return "[Result for RQ2]\n" + df.to_string() + "\n\n" + tests + "\n"
+
+
+def rq3_file(recruits, logins):
+    # For one permutation file: the rows to exclude (fewer or more than 6 recruited candidate logins),
+    # the rows that can be scored, and their picks per country.
+    n = min(len(recruits), len(logins))
+    bad = {i for i in range(n) if len(set(recruits[i]) & set(logins[i])) != TEAM}
+    bad.update(range(n, max(len(recruits), len(logins))))
+    groups = load_index().groups
+    valid = [i for i in range(n) if i + 1 in groups]
+    counts = selection.pick_counts(
+        selection.selection_matrix([logins[i] for i in valid], [set(recruits[i]) for i in valid]),
+        selection.country_matrix([logins[i] for i in valid], COUNTRIES, groups=[i + 1 for i in valid],
+                                 case_insensitive=True),
+        len(COUNTRIES))
+    return sorted(bad), valid, counts.tolist()
+
+
+def rq3_files(model_name):
+    # rq3_file per permutation file, from the cache or parsed in a process pool. `run` calls this before
+    # starting its report threads, since forking a process that runs other threads can deadlock the child.
+    directory = RQ_DIR / "RQ3" / model_name / "permutations_results"
+    keys = ["_".join(order) for order in country_orders]
+    hashes = {key: permutations.file_hash(directory / f"{key}.csv") for key in keys}
+    cache = PartitionCache(cache_path("RQ3", model_name), cache_version("RQ3"))
+    changed = [key for key in keys if hashes[key] not in cache.entries]
+    parsed = permutations.load(directory, changed) if changed else {}
+    files = {key: cache.get(hashes[key], lambda: rq3_file(*parsed[key])) for key in keys}
+    cache.save()
+    return files
+
+
+def rq3_report(model_name, files=None):
+    # A row excluded in any order is excluded in all of them, so the exclusions are combined first.
+    files = files if files is not None else rq3_files(model_name)
+    excluded = set().union(*(set(bad) for bad, _, _ in files.values()))
+
+    score = {source: {target: [] for target in COUNTRIES if target != source} for source in COUNTRIES}
+    for order in country_orders:
+        if order == baseline:
+            continue
+        _, valid, counts = files["_".join(order)]
+        counts = np.array(counts, dtype=int).reshape(-1, len(COUNTRIES))
+        tmp = counts[[j for j, i in enumerate(valid) if i not in excluded]]
+        for k, (source, target) in enumerate(zip(COUNTRIES, order)):
+            if source != target:
+                score[source][target].extend(tmp[:, k].tolist())
+    return format_rq3(score)
+
+
+def format_rq3(score):
+    out = ["[Result for RQ3]"]
+    for i in range(2, -1, -1):
+        out.append(f"{i} candidate")
+        for source in COUNTRIES:
+            out.append(f"[Bio-{source}]")
+            for target in COUNTRIES:
+                if source == target:
+                    continue
+                arr = score[source][target]
+                pct = (arr.count(i) / len(arr) * 100) if arr else 0
+                out.append(f"Location-{target}: {pct:.0f}%")
+        out.append("")
+
+    for source in COUNTRIES:
+        out += [f"[{source}]", "Kruskal-Wallis test"]
+        labels = [t for t in COUNTRIES if t != source and score[source][t]]
+        groups = [score[source][t] for t in labels]
+        if len(groups) < 2:
+            out += ["Insufficient data for Kruskal-Wallis", ""]
+            continue
+        _, pval = stats.kruskal(*groups)
+        out.append(f"p = {pval}")
+        if pval < 0.05:
+            out += ["p < 0.05", "Dunn's post-hoc (Bonferroni)"]
+            dm = sp.posthoc_dunn(groups, p_adjust="bonferroni")
+            dm.index = labels
+            dm.columns = labels
+            out.append(dm.to_string())
+        else:
+            out.append("p >= 0.05")
+        out.append("")
+    return "".join(line + "\n" for line in out)
+
+
+def report(rq, model_name, canonicalize=attribution.normalization_role, rq3_inputs=None):
+    if rq == "RQ1":
+        return rq1_report(model_name)
+    if rq == "RQ2":
+        return rq2_report(model_name, canonicalize)
+    return rq3_report(model_name, (rq3_inputs or {}).get(model_name))
+
+
+def run(rqs=RQS, model_names=MODEL_NAMES, workers=4, taxonomy=False, echo=False):
+    # Writes every requested report; a report whose inputs are missing is skipped with a message.
+    load_index()
+    if taxonomy:
+        from recruitment.roles import RoleCanonicalizer
+        canonicalize = RoleCanonicalizer()
+    else:
+        canonicalize = attribution.normalization_role
+    jobs = [(rq, m) for rq in rqs for m in model_names]
+    written = []
+    # The RQ3 permutation files are parsed here, in a process pool, before the report threads start.
+    rq3_inputs = {}
+    for m in model_names if "RQ3" in rqs else []:
+        try:
+            rq3_inputs[m] = rq3_files(m)
+        except FileNotFoundError:
+            pass
+
+    def work(job):
+        try:
+            return report(*job, canonicalize=canonicalize, rq3_inputs=rq3_inputs)
+        except FileNotFoundError as e:
+            return e
+
+    def on_result(job, text):
+        rq, model_name = job
+        if isinstance(text, Exception):
+            print(f"[{rq} {model_name}] skipped: {text}")
+            return
+        path = report_path(rq, model_name, taxonomy and rq == "RQ2")
+        os.makedirs(path.parent, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        if echo:
+            print(text)
+        print(f"[{rq} {model_name}] Results: {path}")
+        written.append(path)
+
+    run_tasks(jobs, work, max(1, workers), on_result)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute the RQ1/RQ2/RQ3 reports (results_*.txt).")
+    parser.add_argument("--rq", nargs="+", choices=RQS, default=RQS)
+    parser.add_argument("--model", nargs="+", choices=MODEL_NAMES, default=MODEL_NAMES)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--taxonomy", action="store_true", help="RQ2 with the roles.py taxonomy (*_RQ2_taxonomy.txt)")
+    parser.add_argument("--echo", action="store_true", help="also print the reports")
+    args = parser.parse_args(argv)
+    run(args.rq, args.model, workers=args.workers, taxonomy=args.taxonomy, echo=args.echo)
+
+
+if __name__ == "__main__":
+    main()
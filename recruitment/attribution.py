@@ -0,0 +1,100 @@
+# RQ2 role attribution: every reply is split into (login, role) pairs in bulk with pandas string ops,
+# each distinct raw role is canonicalized once, and the role x country contingency table comes from
+# one groupby over the pairs joined with the login index.
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from recruitment.logins import load_index
+
+MIN_TOTAL = 10
+
+
+def normalization_role(r):
+    r = r.lower().strip('><" ,')
+    r = r.replace('-', '').replace('fullstack', 'full stack')
+    return r.replace('quality assurance', 'qa')
+
+
+def pairs_frame(replies):
+    # One row per non-empty reply line with a role: raw login (numbering and quotes removed) and raw role.
+    lines = pd.Series(list(replies), dtype=object).map(
+        lambda cell: cell.splitlines() if isinstance(cell, str) else []).explode()
+    lines = lines[lines.notna() & (lines.str.strip() != "")]
+    parts = lines.str.split(",", n=1, expand=True).reindex(columns=[0, 1])
+    role = parts[1].str.strip()
+    keep = role.notna() & (role != "")
+    login = parts[0][keep].str.strip().str.replace(r'^\d+\.\s*', '', regex=True).str.strip('><"')
+    return pd.DataFrame({"login": login, "role": role[keep]}).reset_index(drop=True)
+
+
+def pair_counts(replies, canonicalize=normalization_role):
+    # Picks per (canonical role, country) pair, in order of first appearance; pairs whose login is not
+    # a candidate are dropped. Counts of several response sets are combined by `contingency_from`.
+    pairs = pairs_frame(replies)
+    countries = {login: c.country for login, c in load_index().entries.items()}
+    pairs["country"] = pairs["login"].map(countries)
+    pairs = pairs[pairs["country"].notna()]
+    raw = pairs["role"].unique()
+    pairs["role"] = pairs["role"].map(dict(zip(raw, map(canonicalize, raw))))
+    if hasattr(canonicalize, "save"):
+        canonicalize.save()
+    return pairs.groupby(["role", "country"], sort=False).size().rename("count").reset_index()
+
+
+def contingency_from(counts, min_total=MIN_TOTAL):
+    # Role x country table of the summed pair counts, rows in report order, keeping roles picked
+    # at least `min_total` times.
+    counts = pd.concat(counts, ignore_index=True).groupby(["role", "country"], sort=False)["count"].sum().reset_index()
+    table = counts.set_index(["role", "country"])["count"].unstack(fill_value=0)
+    table = table.reindex(report_order(counts))
+    table.index.name = table.columns.name = None
+    return table[table.sum(axis=1) >= min_total]
+
+
+def report_order(pairs):
+    # Row order of the reports, which built the table with DataFrame.from_dict(orient='index') from
+    # per-role Counters: roles grouped by country column (countries in order of first appearance),
+    # and by first appearance within a column. `pairs` is in order of first appearance.
+    first = pairs.drop_duplicates(["role", "country"])
+    rank = {role: k for k, role in enumerate(pd.unique(pairs["role"]))}
+    first = first.assign(rank=first["role"].map(rank)).sort_values("rank", kind="stable")
+    order = {}
+    for country in pd.unique(first["country"]):
+        for role in first.loc[first["country"] == country, "role"]:
+            order.setdefault(role, None)
+    return list(order)
+
+
+def percentages(table, countries):
+    # Share of each role's picks per country, as the RQ2 report prints it.
+    df = table.div(table.sum(axis=1), axis=0).mul(100).reindex(columns=countries).fillna(0)
+    return df.round(3)
+
+
+def independence_tests(table, countries):
+    # Chi-square test of role x country independence, and per role and country a two-sided Fisher
+    # exact test of that cell against the rest of the table (Bonferroni over all cells).
+    counts = table.reindex(columns=countries, fill_value=0)
+    counts = counts.loc[:, counts.sum(axis=0) > 0]
+    chi2, p, dof, expected = stats.chi2_contingency(counts.to_numpy())
+    total = counts.to_numpy().sum()
+    row, col = counts.sum(axis=1), counts.sum(axis=0)
+    fisher = pd.DataFrame(1.0, index=counts.index, columns=counts.columns)
+    for role in counts.index:
+        for c in counts.columns:
+            a = counts.at[role, c]
+            cell = [[a, row[role] - a], [col[c] - a, total - row[role] - col[c] + a]]
+            fisher.at[role, c] = stats.fisher_exact(cell)[1]
+    fisher = (fisher * fisher.size).clip(upper=1.0).reindex(columns=countries)
+    return {"chi2": chi2, "p": p, "dof": dof, "low_expected": float(np.mean(expected < 5)), "fisher": fisher}
+
+
+def format_tests(tests):
+    lines = ["Chi-square test (role x country):",
+             f"chi2 = {tests['chi2']:.3f}, dof = {tests['dof']}, p = {tests['p']:.3g}"]
+    if tests["low_expected"] > 0.2:
+        lines.append(f"{tests['low_expected']:.0%} of the expected counts are below 5; see the Fisher tests.")
+    lines += ["", "Fisher's exact test per role and country (Bonferroni):",
+              tests["fisher"].to_string(float_format=lambda v: f"{v:.3g}")]
+    return "\n".join(lines)
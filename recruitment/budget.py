@@ -0,0 +1,205 @@
+# Pre-flight token/cost estimates and a runtime governor enforcing per-provider ceilings.
+import argparse
+import itertools
+import threading
+import time
+from collections import deque, namedtuple
+from functools import lru_cache
+
+from recruitment.config import COUNTRIES, MODELS
+from recruitment.prompts import STRUCTURED_SYSTEM_PROMPT, SYSTEM_PROMPT
+from recruitment.telemetry import load
+
+# Six "<login>,<role>" lines, when no telemetry is available yet.
+DEFAULT_OUTPUT_TOKENS = 60
+MESSAGE_OVERHEAD = 8
+
+Estimate = namedtuple("Estimate", ["requests", "input_tokens", "output_tokens", "cost"])
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def encoding(model):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("o200k_base" if model.startswith("gpt-4o") else "cl100k_base")
+
+
+def count_tokens(text, model=""):
+    # tiktoken when installed (exact for GPT, an approximation for Claude/DeepSeek), ~4 chars per token otherwise.
+    enc = encoding(model)
+    if enc is None:
+        return max(1, len(text) // 4)
+    return len(enc.encode(text))
+
+
+def cost(model_name, input_tokens, output_tokens):
+    price_in, price_out = MODELS[model_name]["price"]
+    return input_tokens / 1e6 * price_in + output_tokens / 1e6 * price_out
+
+
+def observed_output_tokens(model_name):
+    # Mean output tokens per completion from earlier runs' telemetry, if any (scoring calls answer one token).
+    total = count = 0
+    for r in load(provider=model_name):
+        if r.get("status") == "ok" and r.get("output_tokens") and r.get("rq") != "RQ1-scoring":
+            total += r["output_tokens"]
+            count += r.get("n") or 1
+    return total / count if count else None
+
+
+def estimate(model_name, user_prompts, system=SYSTEM_PROMPT, samples_per_request=1):
+    model = MODELS[model_name]["model"]
+    system_tokens = count_tokens(system, model)
+    input_tokens = sum(system_tokens + count_tokens(p, model) + MESSAGE_OVERHEAD for p in user_prompts)
+    per_sample = observed_output_tokens(model_name) or DEFAULT_OUTPUT_TOKENS
+    output_tokens = int(len(user_prompts) * samples_per_request * per_sample)
+    return Estimate(len(user_prompts), input_tokens, output_tokens, cost(model_name, input_tokens, output_tokens))
+
+
+def estimate_collect(model_name, repeats=10, structured=False, multi_sample=False):
+    import pandas as pd
+    from recruitment.config import N_DATASETS, dataset_path
+    from recruitment.prompts import format_candidates
+    prompts = [format_candidates(pd.read_csv(dataset_path(i+1))) for i in range(N_DATASETS)]
+    system = STRUCTURED_SYSTEM_PROMPT if structured else SYSTEM_PROMPT
+    if multi_sample and MODELS[model_name]["provider"] in ("openai", "local") and model_name != "DeepSeek":
+        return estimate(model_name, prompts, system, samples_per_request=repeats)
+    return estimate(model_name, prompts * repeats, system)
+
+
+def estimate_rq3(model_name, orders=None, structured=False, prompts=None):
+    from recruitment.rq3_prompts import compile_prompts
+    orders = orders or list(itertools.permutations(COUNTRIES, r=5))
+    prompts = prompts if prompts is not None else compile_prompts(orders)
+    system = STRUCTURED_SYSTEM_PROMPT if structured else SYSTEM_PROMPT
+    return estimate(model_name, [p.prompt for p in prompts], system)
+
+
+def format_estimate(label, est):
+    return (f"[{label} pre-flight] {est.requests} requests, ~{est.input_tokens} input and "
+            f"~{est.output_tokens} output tokens, ~${est.cost:.2f}")
+
+
+def per_call(est):
+    # (input, output) tokens of one request of a pre-flight estimate.
+    if est is None or not est.requests:
+        return None
+    return est.input_tokens / est.requests, est.output_tokens / est.requests
+
+
+class BudgetGovernor:
+    # Hard ceilings stop the run (BudgetExceeded); the request-rate ceiling only pauses it.
+    # Calls in flight are counted at the mean cost of a call so far, so ceilings are not overshot by them;
+    # until the first call is charged, at the `expected` (input, output) tokens per call of the pre-flight estimate.
+    def __init__(self, model_name, max_input_tokens=None, max_output_tokens=None, max_cost=None, max_rpm=None,
+                 expected=None):
+        self.model_name = model_name
+        self.expected = expected or (0, DEFAULT_OUTPUT_TOKENS)
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.max_cost = max_cost
+        self.max_rpm = max_rpm
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.requests = 0
+        self.charged = 0
+        self.inflight = 0
+        self.window = deque()
+        self.stopped = None
+        self.paused = 0.0
+        self.lock = threading.Lock()
+
+    @property
+    def spent(self):
+        return cost(self.model_name, self.input_tokens, self.output_tokens)
+
+    def projected(self):
+        k = 1 + self.inflight
+        if self.charged:
+            mean_in, mean_out = self.input_tokens / self.charged, self.output_tokens / self.charged
+        else:
+            mean_in, mean_out = self.expected
+        return self.input_tokens + k * mean_in, self.output_tokens + k * mean_out
+
+    def check(self):
+        tokens_in, tokens_out = self.projected()
+        if self.max_input_tokens is not None and tokens_in > self.max_input_tokens:
+            self.stopped = f"input token ceiling {self.max_input_tokens} reached"
+        elif self.max_output_tokens is not None and tokens_out > self.max_output_tokens:
+            self.stopped = f"output token ceiling {self.max_output_tokens} reached"
+        elif self.max_cost is not None and cost(self.model_name, tokens_in, tokens_out) > self.max_cost:
+            self.stopped = f"spend ceiling ${self.max_cost:.4f} reached"
+
+    def admit(self):
+        while True:
+            with self.lock:
+                if self.stopped is None:
+                    self.check()
+                if self.stopped is not None:
+                    raise BudgetExceeded(f"[{self.model_name}] {self.stopped}")
+                now = time.monotonic()
+                while self.window and now - self.window[0] >= 60:
+                    self.window.popleft()
+                if not self.max_rpm or len(self.window) < self.max_rpm:
+                    self.window.append(now)
+                    self.requests += 1
+                    self.inflight += 1
+                    return
+                wait = 60 - (now - self.window[0])
+                self.paused += wait
+            time.sleep(wait)
+
+    def charge(self, input_tokens, output_tokens):
+        with self.lock:
+            self.inflight -= 1
+            self.charged += 1
+            self.input_tokens += input_tokens or 0
+            self.output_tokens += output_tokens or 0
+
+    def cancel(self):
+        # A failed request: admitted but not billed.
+        with self.lock:
+            self.inflight -= 1
+
+    def report(self):
+        status = f"stopped: {self.stopped}" if self.stopped else "within budget"
+        return (f"[{self.model_name} budget] {self.requests} requests, {self.input_tokens} input / "
+                f"{self.output_tokens} output tokens, ${self.spent:.4f} spent, "
+                f"{self.paused:.0f}s paused by the rate ceiling, {status}")
+
+
+def add_budget_arguments(parser):
+    parser.add_argument("--max-cost", type=float, help="stop once this many USD are spent")
+    parser.add_argument("--max-input-tokens", type=int, help="stop at this many input tokens")
+    parser.add_argument("--max-output-tokens", type=int, help="stop at this many output tokens")
+    parser.add_argument("--max-rpm", type=int, help="pause to stay under this many requests per minute")
+
+
+def budget_from_args(args):
+    limits = {key: getattr(args, key) for key in ("max_cost", "max_input_tokens", "max_output_tokens", "max_rpm")}
+    return {k: v for k, v in limits.items() if v is not None} or None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate the tokens and cost of an experiment before running it.")
+    parser.add_argument("--rq", choices=["RQ1", "RQ2", "RQ3"], required=True)
+    parser.add_argument("--model", choices=list(MODELS), required=True)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--structured", action="store_true")
+    parser.add_argument("--multi-sample", action="store_true")
+    args = parser.parse_args(argv)
+    if args.rq == "RQ3":
+        est = estimate_rq3(args.model, structured=args.structured)
+    else:
+        est = estimate_collect(args.model, args.repeats, args.structured, args.multi_sample)
+    print(format_estimate(f"{args.rq} {args.model}", est))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+import json
+from contextlib import nullcontext
+
+from recruitment.budget import count_tokens
+from recruitment.concurrency import ControlledClient, limiter_for
+from recruitment.config import MODELS, load_setting, load_token
+from recruitment.hedging import HedgedClient
+from recruitment.parsing import TeamWatcher
+from recruitment.telemetry import Telemetry, hooked_requests_session, mark_first_byte
+
+
+def split_system(messages):
+    system_text = ""
+    rest = []
+    for msg in messages:
+        if msg["role"] == "system":
+            system_text += msg["content"] + "\n"
+        else:
+            rest.append(msg)
+    return system_text.strip(), rest
+
+
+class Claude:
+    supports_n = False
+
+    def __init__(self, token, model="claude-3-5-haiku-20241022", base_url=None, max_retries=2, telemetry=None):
+        import anthropic
+        kwargs = {"api_key": token, "max_retries": max_retries}
+        if base_url:
+            kwargs["base_url"] = base_url
+        if telemetry is not None:
+            kwargs["http_client"] = anthropic.DefaultHttpxClient(
+                event_hooks={"response": [lambda response: mark_first_byte()]})
+        self.client = anthropic.Anthropic(**kwargs)
+        self.model = model
+        self.telemetry = telemetry
+        self.governor = None
+
+    def _usage(self, resp):
+        return {
+            "model_version": resp.model,
+            "input_tokens": resp.usage.input_tokens,
+            "output_tokens": resp.usage.output_tokens,
+            "cached_tokens": getattr(resp.usage, "cache_read_input_tokens", None) or 0,
+            "stop_reason": resp.stop_reason,
+        }
+
+    def _create(self, messages, **kwargs):
+        system, rest = split_system(messages)
+        if self.governor is not None:
+            self.governor.admit()
+        try:
+            with self.telemetry.call(model=self.model) if self.telemetry else nullcontext() as record:
+                resp = self.client.messages.create(
+                    model=self.model,
+                    max_tokens=1000,
+                    temperature=1,
+                    system=system,
+                    messages=rest,
+                    **kwargs
+                )
+                usage = self._usage(resp)
+                if record is not None:
+                    record.update(usage)
+        except Exception:
+            if self.governor is not None:
+                self.governor.cancel()
+            raise
+        if self.governor is not None:
+            self.governor.charge(usage["input_tokens"], usage["output_tokens"])
+        return resp
+
+    def chat_completion(self, messages):
+        resp = self._create(messages)
+        if resp.content and hasattr(resp.content[0], "text"):
+            return resp.content[0].text
+        return "Error: No response"
+
+    def structured_completion(self, messages, tool):
+        resp = self._create(
+            messages,
+            tools=[{"name": tool["name"], "description": tool["description"], "input_schema": tool["schema"]}],
+            tool_choice={"type": "tool", "name": tool["name"]},
+        )
+        for block in resp.content or []:
+            if getattr(block, "type", None) == "tool_use" and block.name == tool["name"]:
+                return block.input
+        return {}
+
+    def streamed_completion(self, messages, logins):
+        # Free-text reply read as it streams; the stream is closed once six valid picks are in.
+        # The output tokens of an early-stopped call are estimated from the text received.
+        system, rest = split_system(messages)
+        watcher = TeamWatcher(logins)
+        if self.governor is not None:
+            self.governor.admit()
+        try:
+            with self.telemetry.call(model=self.model, streamed=True) if self.telemetry else nullcontext() as record:
+                with self.client.messages.stream(
+                    model=self.model,
+                    max_tokens=1000,
+                    temperature=1,
+                    system=system,
+                    messages=rest,
+                ) as stream:
+                    for text in stream.text_stream:
+                        if watcher.feed(text):
+                            break
+                    usage = self._usage(stream.current_message_snapshot)
+                if watcher.done:
+                    usage.update(output_tokens=count_tokens(watcher.received, self.model), stop_reason="early_stop")
+                if record is not None:
+                    record.update(usage, early_stop=watcher.done)
+        except Exception:
+            if self.governor is not None:
+                self.governor.cancel()
+            raise
+        if self.governor is not None:
+            self.governor.charge(usage["input_tokens"], usage["output_tokens"])
+        return watcher.reply()
+
+    def conversation(self, prompt, history):
+        history.append({"role": "user", "content": prompt})
+        reply = self.chat_completion(history)
+        history.append({"role": "assistant", "content": reply})
+        return history
+
+
+class ChatGPT:
+    supports_n = True
+
+    def __init__(self, token, model="gpt-4o-mini", api_base=None, telemetry=None):
+        import openai
+        self.openai = openai
+        self.token = token
+        self.model = model
+        self.api_base = api_base
+        self.telemetry = telemetry
+        self.governor = None
+        if telemetry is not None:
+            openai.requestssession = hooked_requests_session
+
+    def _usage(self, response):
+        usage = response.get('usage') or {}
+        return {
+            "model_version": response.get('model'),
+            "input_tokens": usage.get('prompt_tokens') or 0,
+            "output_tokens": usage.get('completion_tokens') or 0,
+            "cached_tokens": (usage.get('prompt_tokens_details') or {}).get('cached_tokens', 0),
+            "stop_reason": response['choices'][0].get('finish_reason') if response['choices'] else None,
+        }
+
+    def _create(self, messages, **kwargs):
+        # Key and base are passed per call so GPT and DeepSeek clients can live in one process.
+        if self.governor is not None:
+            self.governor.admit()
+        try:
+            with self.telemetry.call(model=self.model, n=kwargs.get("n", 1)) if self.telemetry else nullcontext() as record:
+                response = self.openai.ChatCompletion.create(
+                    model=self.model,
+                    temperature=1,
+                    messages=messages,
+                    api_key=self.token,
+                    api_base=self.api_base,
+                    **kwargs
+                )
+                usage = self._usage(response)
+                if record is not None:
+                    record.update(usage)
+        except Exception:
+            if self.governor is not None:
+                self.governor.cancel()
+            raise
+        if self.governor is not None:
+            self.governor.charge(usage["input_tokens"], usage["output_tokens"])
+        return response
+
+    def chat_completion(self, messages):
+        response = self._create(messages)
+        return response['choices'][0]['message']['content'] if response['choices'] else "Error: No response"
+
+    def chat_completions(self, messages, n):
+        response = self._create(messages, n=n)
+        return [choice['message']['content'] for choice in response['choices']]
+
+    def streamed_completion(self, messages, logins):
+        watcher = TeamWatcher(logins)
+        if self.governor is not None:
+            self.governor.admit()
+        try:
+            with self.telemetry.call(model=self.model, streamed=True) if self.telemetry else nullcontext() as record:
+                stream = self.openai.ChatCompletion.create(
+                    model=self.model,
+                    temperature=1,
+                    messages=messages,
+                    api_key=self.token,
+                    api_base=self.api_base,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                usage, model_version, stop_reason = {}, None, None
+                try:
+                    for chunk in stream:
+                        model_version = chunk.get('model') or model_version
+                        usage = chunk.get('usage') or usage
+                        for choice in chunk['choices']:
+                            stop_reason = choice.get('finish_reason') or stop_reason
+                            watcher.feed(choice['delta'].get('content') or "")
+                        if watcher.done:
+                            break
+                finally:
+                    stream.close()
+                # The usage chunk comes last, so an early-stopped call has none: estimate it.
+                usage = {
+                    "model_version": model_version,
+                    "input_tokens": usage.get('prompt_tokens')
+                    or sum(count_tokens(m["content"], self.model) for m in messages),
+                    "output_tokens": usage.get('completion_tokens') or count_tokens(watcher.received, self.model),
+                    "cached_tokens": (usage.get('prompt_tokens_details') or {}).get('cached_tokens', 0),
+                    "stop_reason": "early_stop" if watcher.done else stop_reason,
+                }
+                if record is not None:
+                    record.update(usage, early_stop=watcher.done)
+        except Exception:
+            if self.governor is not None:
+                self.governor.cancel()
+            raise
+        if self.governor is not None:
+            self.governor.charge(usage["input_tokens"], usage["output_tokens"])
+        return watcher.reply()
+
+    def _tool_kwargs(self, tool):
+        return {
+            "tools": [{"type": "function", "function": {
+                "name": tool["name"], "description": tool["description"], "parameters": tool["schema"],
+            }}],
+            "tool_choice": {"type": "function", "function": {"name": tool["name"]}},
+        }
+
+    def _tool_arguments(self, choice, tool):
+        for call in choice['message'].get('tool_calls') or []:
+            if call['function']['name'] == tool["name"]:
+                try:
+                    return json.loads(call['function']['arguments'])
+                except json.JSONDecodeError:
+                    return {}
+        return {}
+
+    def structured_completion(self, messages, tool):
+        response = self._create(messages, **self._tool_kwargs(tool))
+        if not response['choices']:
+            return {}
+        return self._tool_arguments(response['choices'][0], tool)
+
+    def structured_completions(self, messages, tool, n):
+        response = self._create(messages, n=n, **self._tool_kwargs(tool))
+        return [self._tool_arguments(choice, tool) for choice in response['choices']]
+
+    def choice_logprobs(self, messages, options):
+        # Log-probability of each single-token option as the first token of the reply;
+        # options outside the top 20 are left out.
+        response = self._create(messages, max_tokens=1, logprobs=True, top_logprobs=20)
+        content = (response['choices'][0].get('logprobs') or {}).get('content') or []
+        out = {}
+        for entry in (content[0]['top_logprobs'] if content else []):
+            token = entry['token'].strip()
+            if token in options and token not in out:
+                out[token] = entry['logprob']
+        return out
+
+    def conversation(self, prompt, history):
+        history.append({"role": "user", "content": prompt})
+        reply = self.chat_completion(history)
+        history.append({"role": "assistant", "content": reply})
+        return history
+
+
+class DeepSeek(ChatGPT):
+    # The DeepSeek API only ever returns one choice.
+    supports_n = False
+
+    def __init__(self, token, model="deepseek-chat", api_base="https://api.deepseek.com/v1", telemetry=None):
+        super().__init__(token, model=model, api_base=api_base, telemetry=telemetry)
+
+
+def make_client(model_name, token=None, adaptive=True, hedge_budget=0.0, telemetry_path=None, governor=None):
+    # <MODEL>_BASE_URL redirects a provider, e.g. to `python -m recruitment.mockserver`.
+    # With `adaptive`, calls go through the provider's AIMD limiter, which also owns the retries (429, 5xx, connection).
+    # A `hedge_budget` > 0 duplicates calls slower than the observed p95, up to that fraction of calls;
+    # the hedging sits inside the limiter, so duplicates take limiter slots and only go out when one is free.
+    # With `telemetry_path` (the results store), every HTTP request is recorded in its telemetry table
+    # (see recruitment/telemetry.py).
+    # A `governor` (recruitment/budget.py) is charged for every request and stops the run at its ceilings.
+    # The local backend has no rate limits, so it is never wrapped in the AIMD limiter.
+    spec = MODELS[model_name]
+    token = token or load_token(model_name)
+    base_url = load_setting(spec["base_url"])
+    telemetry = Telemetry(telemetry_path, model_name) if telemetry_path else None
+    if spec["provider"] == "local":
+        from recruitment.local import LocalModel
+        client = LocalModel(spec["model"], path=base_url, max_batch=int(load_setting("LOCAL_MAX_BATCH") or 16),
+                            telemetry=telemetry)
+        adaptive = False
+    elif spec["provider"] == "anthropic":
+        client = Claude(token, model=spec["model"], base_url=base_url, max_retries=0 if adaptive else 2,
+                        telemetry=telemetry)
+    else:
+        cls = DeepSeek if model_name == "DeepSeek" else ChatGPT
+        client = cls(token, model=spec["model"], api_base=base_url or spec.get("api_base"), telemetry=telemetry)
+    client.governor = governor
+    limiter = limiter_for(model_name) if adaptive else None
+    if hedge_budget:
+        client = HedgedClient(client, budget=hedge_budget, limiter=limiter)
+    if adaptive:
+        client = ControlledClient(client, limiter)
+    return client
@@ -0,0 +1,152 @@
+# Single recruitment-collection stage: the stored responses feed both RQ1 (countries) and RQ2 (roles).
+import argparse
+import csv
+import hashlib
+
+import pandas as pd
+
+from recruitment.budget import (BudgetExceeded, BudgetGovernor, add_budget_arguments, budget_from_args,
+                                estimate, format_estimate, per_call)
+from recruitment.clients import make_client
+from recruitment.config import MODELS, N_DATASETS, RECRUIT_RESULTS_DIR, STORE_PATH, dataset_path, run_dir
+from recruitment.prompts import STRUCTURED_SYSTEM_PROMPT, SYSTEM_PROMPT, format_candidates
+from recruitment.recruiter import Recruiter, ValidityStats
+from recruitment.store import ResultStore, store_rq
+from recruitment.telemetry import labelled, load, stream_savings
+
+
+def fingerprint(model, system, prompt):
+    return hashlib.sha256("\0".join([model, system, prompt]).encode("utf-8")).hexdigest()[:16]
+
+
+def stored_rows(path, model, system):
+    # fingerprint -> stored row, for the rows of a run that can be reused as they are. The fingerprint
+    # is computed from the prompt stored in the row, with the model and the system prompt of the run's
+    # mode (structured runs have their own folder).
+    if not path.exists():
+        return {}
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    return {fingerprint(model, system, row["Candidate list"]): row for row in rows
+            if not (row["Recruit"] or "").startswith("Error:")}
+
+
+def execute(model_name, repeats=10, structured=False, max_reasks=0, token=None, multi_sample=False,
+            hedge_budget=0.0, budget=None, stream=False):
+    # Dataset-major: with `multi_sample` the missing repetitions of a prompt are requested together
+    # (one n-completion call, or parallel calls where `n` is not supported) and split back into run_XX.
+    spec = MODELS[model_name]
+    system = STRUCTURED_SYSTEM_PROMPT if structured else SYSTEM_PROMPT
+    mode = "structured" if structured else "text"
+    key = store_rq("RQ1/RQ2", structured)
+    groups = [pd.read_csv(dataset_path(i+1)) for i in range(N_DATASETS)]
+    prompts = [format_candidates(df) for df in groups]
+    expected = [fingerprint(spec["model"], system, p) for p in prompts]
+
+    stats = ValidityStats()
+    reps = range(1, repeats+1)
+    stored = {}
+    for rep in reps:
+        output_path = run_dir(model_name, rep, structured) / spec["results_file"]
+        stored[rep] = stored_rows(output_path, spec["model"], system)
+    recruiter = Recruiter(None, structured=structured, max_reasks=max_reasks, stats=stats, stream=stream)
+    store = ResultStore()
+
+    todo = [prompts[i] for i in range(N_DATASETS) for rep in reps if expected[i] not in stored[rep]]
+    est = estimate(model_name, todo, system) if todo else None
+    if est is not None:
+        print(format_estimate(f"RQ1/RQ2 {model_name}", est))
+    # `budget` holds BudgetGovernor ceilings (max_cost, max_input_tokens, max_output_tokens, max_rpm).
+    governor = BudgetGovernor(model_name, expected=per_call(est), **budget) if budget else None
+    client = None
+    reused = called = failed = requests = 0
+    stopped = None
+    for i, df in enumerate(groups):
+        logins = df['login'].tolist()
+        missing = [rep for rep in reps if expected[i] not in stored[rep]]
+        if stopped:
+            missing = []
+        if missing and client is None:
+            client = make_client(model_name, token, hedge_budget=hedge_budget, governor=governor,
+                                 telemetry_path=STORE_PATH)
+            recruiter.client = client
+        replies = {}
+        batches = [missing] if multi_sample else [[rep] for rep in missing]
+        for batch in [b for b in batches if b]:
+            try:
+                with labelled(rq="RQ1/RQ2", dataset=i+1, runs=batch):
+                    out = recruiter.ask_many(prompts[i], logins, len(batch))
+            except BudgetExceeded as e:
+                # The remaining rows are written as errors so files stay aligned; rerunning resumes there.
+                print(f"Stopped on dataset {i+1}: {e}")
+                stopped = str(e)
+                out = [f"Error: {e}"] * len(batch)
+            except Exception as e:
+                print(f"Error on dataset {i+1}, runs {batch}: {e}")
+                out = [f"Error: {e}"] * len(batch)
+            replies.update(zip(batch, out))
+            requests += 1
+        for rep in reps:
+            row = stored[rep].get(expected[i])
+            if stopped and row is None and rep not in replies:
+                replies[rep] = f"Error: {stopped}"
+            if row is not None:
+                store.add(key, model_name, i+1, row["Candidate list"], row["Recruit"], row["login"].split(","),
+                          expected[i], run_id=rep)
+                reused += 1
+            else:
+                store.add(key, model_name, i+1, prompts[i], replies[rep], logins, expected[i], run_id=rep)
+                if replies[rep].startswith("Error:"):
+                    failed += 1
+                else:
+                    called += 1
+        # One commit per dataset: a crash loses at most the calls of the dataset in progress.
+        store.flush()
+        if missing:
+            print(f"Dataset {i+1}/{N_DATASETS} done (runs {', '.join(f'{r:02d}' for r in missing)})")
+
+    for rep in reps:
+        store.export_csv(run_dir(model_name, rep, structured) / spec["results_file"], key, model_name, run_id=rep)
+    store.close()
+
+    if hasattr(client, "limiter"):
+        print(client.limiter.report(model_name))
+    if hasattr(client, "hedges") or hasattr(client, "batches"):
+        print(client.report(model_name))
+    if governor is not None:
+        print(governor.report())
+    if stream and client is not None:
+        print(stream_savings(load(provider=model_name, rq="RQ1/RQ2")))
+    print(f"[{model_name}] reused {reused} stored responses (matching prompt fingerprints), "
+          f"collected {called} new responses in {requests} request groups, {failed} error rows")
+    if stats.calls:
+        report = stats.report(f"{model_name} ({mode})")
+        print(report)
+        with open(RECRUIT_RESULTS_DIR / model_name / f"validity_{mode}.txt", "w", encoding="utf-8") as f:
+            f.write(report)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Collect recruiter decisions for RQ1 and RQ2.")
+    parser.add_argument("--model", choices=list(MODELS), required=True)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--structured", action="store_true",
+                        help="answer through a tool call constrained to the 10 candidate logins")
+    parser.add_argument("--reasks", type=int, default=0,
+                        help="how many times an invalid reply is asked again")
+    parser.add_argument("--multi-sample", action="store_true",
+                        help="request all repetitions of a prompt at once (`n` completions where supported)")
+    parser.add_argument("--hedge-budget", type=float, default=0.0,
+                        help="fraction of calls that may be duplicated when slower than the p95 latency")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream free-text replies and close each stream after six valid picks")
+    add_budget_arguments(parser)
+    args = parser.parse_args(argv)
+    execute(args.model, repeats=args.repeats, structured=args.structured, max_reasks=args.reasks,
+            multi_sample=args.multi_sample, hedge_budget=args.hedge_budget, budget=budget_from_args(args),
+            stream=args.stream)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# Adaptive (AIMD) concurrency control per provider, driven by 429/overload responses and latency.
+import random
+import threading
+import time
+
+from recruitment.telemetry import labelled
+
+OVERLOAD_STATUS = {429, 503, 529}
+# Connection failures and timeouts of anthropic, openai<1 and requests, matched by class name.
+CONNECTION_ERRORS = {"APIConnectionError", "APITimeoutError", "Timeout", "ConnectionError", "TimeoutError"}
+CALLS = ("chat_completion", "chat_completions", "structured_completion", "structured_completions", "choice_logprobs",
+         "streamed_completion")
+
+
+def error_status(exc):
+    return getattr(exc, "status_code", None) or getattr(exc, "http_status", None)
+
+
+def transient(exc):
+    # Server errors other than overloads, and connection errors: retried like the provider SDKs do.
+    status = error_status(exc)
+    if status is not None:
+        return status >= 500 and status not in OVERLOAD_STATUS
+    return any(cls.__name__ in CONNECTION_ERRORS for cls in type(exc).__mro__)
+
+
+def retry_after(exc):
+    # anthropic errors carry the httpx response, openai<1 errors carry the headers directly.
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or getattr(exc, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class AIMDLimiter:
+    def __init__(self, initial=4, minimum=1, maximum=64, decrease=0.5, latency_tolerance=2.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.inflight = 0
+        self.paused_until = 0.0
+        self.latency = None
+        self.best_latency = None
+        self.successes = 0
+        self.overloads = 0
+        self.peak = self.limit
+        self.decreases = 0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        # Returns the number of decreases so far, which `release` uses to tell requests sent before
+        # the last decrease from those sent after it.
+        with self.cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait <= 0 and self.inflight < int(self.limit):
+                    break
+                self.cond.wait(timeout=wait if wait > 0 else None)
+            self.inflight += 1
+            return self.decreases
+
+    def try_acquire(self):
+        # Like `acquire`, but returns None instead of waiting when no slot is free.
+        with self.cond:
+            if self.paused_until > time.monotonic() or self.inflight >= int(self.limit):
+                return None
+            self.inflight += 1
+            return self.decreases
+
+    def healthy(self, latency):
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self.best_latency = self.latency if self.best_latency is None else min(self.best_latency, self.latency)
+        return self.latency <= self.latency_tolerance * self.best_latency
+
+    def release(self, latency=None, overloaded=False, pause=None, ticket=None):
+        with self.cond:
+            self.inflight -= 1
+            if overloaded:
+                # Multiplicative decrease at most once per congestion window: overloads of requests sent
+                # before the last decrease were already answered by it. No new request before Retry-After.
+                self.overloads += 1
+                if ticket is None or ticket == self.decreases:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self.decreases += 1
+                if pause:
+                    self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            elif latency is not None:
+                self.successes += 1
+                if self.healthy(latency):
+                    # Additive increase: about +1 per `limit` successful calls.
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                    self.peak = max(self.peak, self.limit)
+            self.cond.notify_all()
+
+    def report(self, label):
+        latency = f"{self.latency:.2f}s" if self.latency is not None else "n/a"
+        return (f"[{label}] concurrency limit {self.limit:.1f} (peak {self.peak:.1f}), "
+                f"{self.successes} successes, {self.overloads} overload responses ({self.decreases} decreases), "
+                f"latency EWMA {latency}")
+
+
+class ControlledClient:
+    # Wraps an LLM client: every call takes a slot from the limiter and overloads are retried
+    # after Retry-After (or a short backoff) without surfacing to the caller. The SDK retries are off
+    # (clients.make_client), so 5xx and connection errors are retried here too, with a short backoff.
+    def __init__(self, client, limiter, max_overload_retries=8, max_error_retries=2):
+        self.client = client
+        self.limiter = limiter
+        self.max_overload_retries = max_overload_retries
+        self.max_error_retries = max_error_retries
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name not in CALLS:
+            return attr
+
+        def call(*args, **kwargs):
+            overloads = errors = 0
+            while True:
+                ticket = self.limiter.acquire()
+                start = time.monotonic()
+                try:
+                    with labelled(retry=overloads + errors):
+                        result = attr(*args, **kwargs)
+                except Exception as e:
+                    if error_status(e) in OVERLOAD_STATUS and overloads < self.max_overload_retries:
+                        self.limiter.release(overloaded=True, pause=retry_after(e) or min(30.0, 2.0 ** overloads),
+                                             ticket=ticket)
+                        overloads += 1
+                        continue
+                    self.limiter.release()
+                    if not transient(e) or errors == self.max_error_retries:
+                        raise
+                    time.sleep(min(8.0, 0.5 * 2 ** errors) * random.uniform(0.75, 1.0))
+                    errors += 1
+                    continue
+                self.limiter.release(latency=time.monotonic() - start)
+                return result
+        return call
+
+
+LIMITERS = {}
+LIMITERS_LOCK = threading.Lock()
+
+
+def limiter_for(name, **kwargs):
+    # One limiter per provider, shared by every client of that provider in the process.
+    with LIMITERS_LOCK:
+        if name not in LIMITERS:
+            LIMITERS[name] = AIMDLimiter(**kwargs)
+        return LIMITERS[name]
@@ -0,0 +1,104 @@
+import json
+import os
+import pathlib
+
+REPLICATION_DIR = pathlib.Path(__file__).resolve().parent.parent
+CONFIG_JSON = REPLICATION_DIR.parent / "config.json"
+DATASET_DIR = REPLICATION_DIR / "dataset_extraction"
+RQ_DIR = REPLICATION_DIR / "RQ"
+RECRUIT_RESULTS_DIR = RQ_DIR / "recruit-results"
+# SQLite results store (recruitment/store.py); per-call telemetry is a table of the same file.
+STORE_PATH = RQ_DIR / "results.sqlite"
+
+COUNTRY_CODES = {
+    'US': 'United States',
+    'BR': 'Brazil',
+    'IN': 'India',
+    'UK': 'United Kingdom',
+    'NG': 'Nigeria',
+}
+COUNTRIES = list(COUNTRY_CODES.keys())
+
+N_DATASETS = 100
+
+# "price": USD per million input / output tokens, used by recruitment/budget.py.
+MODELS = {
+    "Claude": {
+        "provider": "anthropic",
+        "model": "claude-3-5-haiku-20241022",
+        "token": "CLAUDE_TOKEN",
+        "base_url": "CLAUDE_BASE_URL",
+        "results_file": "claude-3-5-haiku_results.csv",
+        "price": (0.80, 4.00),
+    },
+    "DeepSeek": {
+        "provider": "openai",
+        "model": "deepseek-chat",
+        "token": "DEEPSEEK_API_KEY",
+        "base_url": "DEEPSEEK_BASE_URL",
+        "api_base": "https://api.deepseek.com/v1",
+        "results_file": "deepseek-chat_results.csv",
+        "price": (0.27, 1.10),
+    },
+    "GPT": {
+        "provider": "openai",
+        "model": "gpt-4o-mini",
+        "token": "CHATGPT_TOKEN",
+        "base_url": "CHATGPT_BASE_URL",
+        "api_base": "https://api.openai.com/v1",
+        "results_file": "gpt-4o-mini_results.csv",
+        "price": (0.15, 0.60),
+    },
+    # Open-weight model run on CPU by recruitment/local.py; LOCAL_MODEL_PATH points to downloaded weights.
+    "Local": {
+        "provider": "local",
+        "model": "Qwen/Qwen2.5-0.5B-Instruct",
+        "token": None,
+        "base_url": "LOCAL_MODEL_PATH",
+        "results_file": "qwen2.5-0.5b-instruct_results.csv",
+        "price": (0.0, 0.0),
+    },
+}
+
+
+def load_config():
+    if CONFIG_JSON.exists():
+        with open(CONFIG_JSON, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def load_setting(key):
+    return load_config().get(key) or os.getenv(key)
+
+
+def load_token(model_name):
+    key = MODELS[model_name]["token"]
+    if key is None:
+        return None
+    token = load_setting(key)
+    if not token:
+        raise RuntimeError(f"You must set `{key}` in the config or environment.")
+    return token
+
+
+# The GPT analyses read the combined file after its manual fixes.
+COMBINED_FILES = {"GPT": "combined_results_fixed.csv"}
+
+
+def analysis_input(model_name):
+    # Combined RQ1/RQ2 results file the analyses read.
+    return RECRUIT_RESULTS_DIR / model_name / "all-results" / COMBINED_FILES.get(model_name, "combined_results.csv")
+
+
+def dataset_path(index):
+    return DATASET_DIR / f"dataset_{index:03d}.csv"
+
+
+def run_dir(model_name, rep, structured=False):
+    # Structured-mode runs live in their own folder, apart from the text-mode replication runs.
+    return RECRUIT_RESULTS_DIR / model_name / ("structured" if structured else "") / f"run_{rep:02d}"
+
+
+def permutations_dir(model_name, structured=False):
+    return RQ_DIR / "RQ3" / model_name / ("structured" if structured else "") / "permutations_results"
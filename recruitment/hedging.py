@@ -0,0 +1,125 @@
+# Hedged requests: if a call is slower than the provider's observed p95, send a duplicate and keep the first reply.
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from recruitment.concurrency import CALLS, OVERLOAD_STATUS, error_status, retry_after
+from recruitment.telemetry import carry, labelled
+
+
+class LatencyTracker:
+    def __init__(self, window=500):
+        self.samples = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def add(self, latency):
+        with self.lock:
+            self.samples.append(latency)
+
+    def percentile(self, q):
+        with self.lock:
+            data = sorted(self.samples)
+        if not data:
+            return None
+        return data[min(len(data) - 1, int(q * len(data)))]
+
+    def __len__(self):
+        return len(self.samples)
+
+
+class HedgedClient:
+    # Sits inside the provider's AIMD limiter (ControlledClient), so the p95 is that of the provider calls
+    # alone, without limiter queueing or overload backoff. A duplicate needs a free limiter slot, which
+    # it holds until both requests are done; while the provider is saturated nothing is hedged.
+    # The duplicate is cancelled if it has not started yet; once in flight the losing request is
+    # abandoned and its reply discarded (it is still billed and charged, hence the budget on hedges).
+    def __init__(self, client, budget=0.05, quantile=0.95, min_samples=20, max_workers=128, limiter=None):
+        self.client = client
+        self.limiter = limiter
+        self.budget = budget
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.tracker = LatencyTracker()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name not in CALLS:
+            return attr
+        return lambda *args, **kwargs: self.call(attr, *args, **kwargs)
+
+    def timed(self, fn, *args, **kwargs):
+        start = time.monotonic()
+        result = fn(*args, **kwargs)
+        self.tracker.add(time.monotonic() - start)
+        return result
+
+    def hedge_slot(self):
+        # Limiter ticket for the duplicate (0 without a limiter), or None when it may not be sent.
+        with self.lock:
+            if self.hedges + 1 > self.budget * self.calls:
+                return None
+            ticket = self.limiter.try_acquire() if self.limiter is not None else 0
+            if ticket is not None:
+                self.hedges += 1
+            return ticket
+
+    def hold(self, ticket, primary, backup):
+        # Releases the duplicate's slot once both requests have finished.
+        if self.limiter is None:
+            return
+        remaining = [2]
+        lock = threading.Lock()
+
+        def done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            exc = None if backup.cancelled() else backup.exception()
+            overloaded = exc is not None and error_status(exc) in OVERLOAD_STATUS
+            self.limiter.release(overloaded=overloaded, pause=retry_after(exc) if overloaded else None, ticket=ticket)
+        primary.add_done_callback(done)
+        backup.add_done_callback(done)
+
+    def call(self, fn, *args, **kwargs):
+        with self.lock:
+            self.calls += 1
+        threshold = self.tracker.percentile(self.quantile) if len(self.tracker) >= self.min_samples else None
+        primary = self.pool.submit(carry(self.timed), fn, *args, **kwargs)
+        if threshold is None:
+            return primary.result()
+        done, _ = wait([primary], timeout=threshold)
+        if done:
+            return primary.result()
+        ticket = self.hedge_slot()
+        if ticket is None:
+            return primary.result()
+
+        with labelled(hedge=True):
+            backup = self.pool.submit(carry(self.timed), fn, *args, **kwargs)
+        self.hold(ticket, primary, backup)
+        pending = {primary, backup}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut.exception() is None or not pending:
+                    for loser in pending:
+                        loser.cancel()
+                    if fut is backup and fut.exception() is None:
+                        with self.lock:
+                            self.hedge_wins += 1
+                    return fut.result()
+
+    def report(self, label):
+        p95 = self.tracker.percentile(self.quantile)
+        extra = f"{self.hedges / self.calls * 100:.1f}%" if self.calls else "n/a"
+        threshold = f"{p95:.2f}s" if p95 is not None else "n/a"
+        return (f"[{label}] hedged {self.hedges} of {self.calls} calls ({extra} extra requests, "
+                f"budget {self.budget * 100:.1f}%), duplicate won {self.hedge_wins} times, "
+                f"p{self.quantile * 100:.0f} latency {threshold}")
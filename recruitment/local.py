@@ -0,0 +1,193 @@
+# Open-weight chat model run on CPU with transformers, behind the same interface as recruitment/clients.py.
+import copy
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import nullcontext
+
+
+class LocalModel:
+    # Calls from the scheduler's worker threads are queued and answered in batches: one `generate`
+    # per batch, starting from the KV cache of the chat-template prefix shared by the batch (the system prompt).
+    supports_n = True
+
+    def __init__(self, model, path=None, max_batch=16, max_wait=0.05, max_new_tokens=200, temperature=1.0,
+                 threads=None, telemetry=None):
+        try:
+            import torch
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+        except ImportError:
+            raise RuntimeError("The local backend needs `pip install torch transformers`.")
+        self.torch = torch
+        if threads:
+            torch.set_num_threads(threads)
+        self.tokenizer = AutoTokenizer.from_pretrained(path or model)
+        self.llm = AutoModelForCausalLM.from_pretrained(path or model, torch_dtype=torch.float32)
+        self.llm.eval()
+        self.model = model
+        self.pad_id = self.tokenizer.pad_token_id if self.tokenizer.pad_token_id is not None \
+            else self.tokenizer.eos_token_id
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+        self.telemetry = telemetry
+        self.governor = None
+        self.prefixes = {}
+        self.batches = self.rows = 0
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def _encode(self, messages):
+        return self.tokenizer.apply_chat_template(messages, add_generation_prompt=True, tokenize=True)
+
+    def _prefix(self, system):
+        # Token prefix common to every prompt with this system message, and its KV cache.
+        if system not in self.prefixes:
+            a = self._encode([{"role": "system", "content": system}, {"role": "user", "content": "a"}])
+            b = self._encode([{"role": "system", "content": system}, {"role": "user", "content": "b"}])
+            n = next((k for k, (x, y) in enumerate(zip(a, b)) if x != y), min(len(a), len(b)))
+            ids = a[:n]
+            cache = None
+            if ids:
+                with self.torch.no_grad():
+                    cache = self.llm(self.torch.tensor([ids]), use_cache=True).past_key_values
+            self.prefixes[system] = (ids, cache)
+        return self.prefixes[system]
+
+    def _loop(self):
+        while True:
+            batch = [self.queue.get()]
+            rows = batch[0][1]
+            deadline = time.monotonic() + self.max_wait
+            while rows < self.max_batch:
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                batch.append(item)
+                rows += item[1]
+            by_system = {}
+            for item in batch:
+                by_system.setdefault(self._system(item[0]), []).append(item)
+            for system, items in by_system.items():
+                try:
+                    with self.lock:
+                        results = self._generate(system, items)
+                except Exception as e:
+                    for _, _, fut in items:
+                        fut.set_exception(e)
+                    continue
+                for (_, _, fut), result in zip(items, results):
+                    fut.set_result(result)
+
+    @staticmethod
+    def _system(messages):
+        return "\n".join(m["content"] for m in messages if m["role"] == "system")
+
+    def _generate(self, system, items):
+        torch = self.torch
+        prefix, cache = self._prefix(system)
+        full = []
+        for messages, n, _ in items:
+            full += [self._encode(messages)] * n
+        if cache is not None and any(ids[:len(prefix)] != prefix for ids in full):
+            prefix, cache = [], None
+        suffixes = [ids[len(prefix):] for ids in full]
+        width = max(len(s) for s in suffixes)
+        # Padding goes between the shared prefix and each suffix; the attention mask hides it
+        # and the position ids are derived from the mask, so the cached prefix stays valid for every row.
+        input_ids = [prefix + [self.pad_id] * (width - len(s)) + s for s in suffixes]
+        mask = [[1] * len(prefix) + [0] * (width - len(s)) + [1] * len(s) for s in suffixes]
+        kwargs = {}
+        if cache is not None:
+            kwargs["past_key_values"] = copy.deepcopy(cache)
+            kwargs["past_key_values"].batch_repeat_interleave(len(full))
+        with torch.no_grad():
+            out = self.llm.generate(
+                input_ids=torch.tensor(input_ids),
+                attention_mask=torch.tensor(mask),
+                do_sample=True,
+                temperature=self.temperature,
+                max_new_tokens=self.max_new_tokens,
+                pad_token_id=self.pad_id,
+                **kwargs
+            )
+        generated = out[:, len(input_ids[0]):]
+        texts = self.tokenizer.batch_decode(generated, skip_special_tokens=True)
+        lengths = (generated != self.pad_id).sum(dim=1).tolist()
+        self.batches += 1
+        self.rows += len(full)
+
+        results = []
+        k = 0
+        for messages, n, _ in items:
+            results.append({
+                "texts": texts[k:k+n],
+                "input_tokens": sum(len(ids) for ids in full[k:k+n]),
+                "output_tokens": sum(lengths[k:k+n]),
+                "cached_tokens": len(prefix) * n if cache is not None else 0,
+            })
+            k += n
+        return results
+
+    def _create(self, messages, n=1):
+        if self.governor is not None:
+            self.governor.admit()
+        try:
+            with self.telemetry.call(model=self.model, n=n) if self.telemetry else nullcontext() as record:
+                fut = Future()
+                self.queue.put((messages, n, fut))
+                result = fut.result()
+                if record is not None:
+                    record.update(model_version=self.model, input_tokens=result["input_tokens"],
+                                  output_tokens=result["output_tokens"], cached_tokens=result["cached_tokens"])
+        except Exception:
+            if self.governor is not None:
+                self.governor.cancel()
+            raise
+        if self.governor is not None:
+            self.governor.charge(result["input_tokens"], result["output_tokens"])
+        return result["texts"]
+
+    def chat_completion(self, messages):
+        return self._create(messages)[0]
+
+    def chat_completions(self, messages, n):
+        return self._create(messages, n=n)
+
+    def streamed_completion(self, messages, logins):
+        # Generation is batched, not streamed: the whole reply is generated and returned as it is.
+        return self.chat_completion(messages)
+
+    def choice_logprobs(self, messages, options):
+        # Next-token log-probabilities after the prompt, for options that encode to a single token.
+        torch = self.torch
+        ids = self._encode(messages)
+        with self.lock, torch.no_grad():
+            logits = self.llm(torch.tensor([ids])).logits[0, -1]
+        logprobs = torch.log_softmax(logits.float(), dim=-1)
+        out = {}
+        for option in options:
+            token_ids = self.tokenizer.encode(option, add_special_tokens=False)
+            if len(token_ids) == 1:
+                out[option] = logprobs[token_ids[0]].item()
+        return out
+
+    def structured_completion(self, messages, tool):
+        raise RuntimeError("The local backend has no tool calls; run it without --structured.")
+
+    def structured_completions(self, messages, tool, n):
+        return self.structured_completion(messages, tool)
+
+    def conversation(self, prompt, history):
+        history.append({"role": "user", "content": prompt})
+        reply = self.chat_completion(history)
+        history.append({"role": "assistant", "content": reply})
+        return history
+
+    def report(self, label):
+        mean = self.rows / self.batches if self.batches else 0
+        return f"[{label}] {self.rows} completions in {self.batches} batches ({mean:.1f} per forward pass)"
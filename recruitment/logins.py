@@ -0,0 +1,69 @@
+# Persisted login -> (group, country, attributes) index over dataset_extraction/dataset_XXX.csv,
+# loaded once per process, so the analyses look candidates up instead of re-reading the datasets.
+import csv
+import gzip
+import hashlib
+import json
+from collections import namedtuple
+from functools import lru_cache
+
+from recruitment.config import DATASET_DIR
+
+INDEX_PATH = DATASET_DIR / "login_index.json.gz"
+
+Candidate = namedtuple("Candidate", ["group", "country", "location", "bio", "created_at"])
+
+
+def dataset_files():
+    return sorted(DATASET_DIR.glob("dataset_[0-9][0-9][0-9].csv"))
+
+
+def signature(files):
+    return [[f.name, f.stat().st_size, f.stat().st_mtime_ns] for f in files]
+
+
+def build(files):
+    # First occurrence wins, like the analyses' lookups over the concatenated datasets.
+    entries = {}
+    for path in files:
+        group = int(path.stem.split("_")[1])
+        with open(path, newline='', encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                login = row["login"]
+                if login and login not in entries:
+                    entries[login] = [group, row["country"] or None, row["location"], row["bio"], row["createdAt"]]
+    return entries
+
+
+class LoginIndex:
+    def __init__(self, entries):
+        self.entries = {login: Candidate(*e) for login, e in entries.items()}
+        self.lower = {}
+        for login, c in self.entries.items():
+            self.lower.setdefault(login.strip().lower(), c)
+        self.groups = {c.group for c in self.entries.values()}
+        # Content hash, for results derived from the index (see analysis.PartitionCache).
+        self.version = hashlib.sha256(json.dumps(entries, sort_keys=True).encode()).hexdigest()[:16]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+@lru_cache(maxsize=None)
+def load_index(path=INDEX_PATH):
+    # Rebuilt (and saved again) only when a dataset file changed size or modification time.
+    files = dataset_files()
+    sig = signature(files)
+    if path.exists():
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored["signature"] == sig:
+            return LoginIndex(stored["entries"])
+    entries = build(files)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"signature": sig, "entries": entries}, f)
+    return LoginIndex(entries)
+
+
+if __name__ == "__main__":
+    print(f"{len(load_index())} logins indexed in {INDEX_PATH}")
@@ -0,0 +1,146 @@
+# Incremental merge of the per-run result files into all-results/combined_results.csv.
+# The runs are streamed row by row, and a run whose content hash is unchanged since the last merge
+# is copied over byte for byte from the previous combined file instead of being parsed again.
+import argparse
+import csv
+import hashlib
+import json
+import os
+import pathlib
+
+from recruitment.config import MODELS, RECRUIT_RESULTS_DIR, RQ_DIR
+from recruitment.recruiter import RESULT_COLUMNS
+
+
+def sources(rq, model_name, runs=None):
+    # (key, path) pairs in merge order: run_XX for RQ1/RQ2, the order files for RQ3.
+    if rq == "RQ3":
+        paths = sorted((RQ_DIR / "RQ3" / model_name / "permutations_results").glob("*.csv"))
+        found = [(p.stem, p) for p in paths]
+    else:
+        fname = MODELS[model_name]["results_file"]
+        found = [(p.parent.name, p) for p in sorted((RECRUIT_RESULTS_DIR / model_name).glob(f"run_*/{fname}"))]
+    if runs is not None:
+        by_key = dict(found)
+        for key in runs:
+            if key not in by_key:
+                print(f"Error: file not found -> {key}")
+        found = [(key, by_key[key]) for key in runs if key in by_key]
+    return found
+
+
+def combined_path(rq, model_name):
+    if rq == "RQ3":
+        return RQ_DIR / "RQ3" / model_name / "all-results" / "combined_results.csv"
+    return RECRUIT_RESULTS_DIR / model_name / "all-results" / "combined_results.csv"
+
+
+def state_path(out):
+    return pathlib.Path(str(out).rsplit(".", 1)[0] + ".merge.json")
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_state(out, key_column):
+    path = state_path(out)
+    if not path.exists() or not pathlib.Path(out).exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("key_column") != key_column or state.get("size") != os.path.getsize(out):
+        return None
+    return state
+
+
+def write_segment(f, key, path, key_column):
+    # Streams one source file into the open combined file; returns the rows written.
+    rows = 0
+    with open(path, newline='', encoding="utf-8") as src:
+        reader = csv.reader(src)
+        next(reader, None)
+        writer = csv.writer(f, lineterminator="\n")
+        for row in reader:
+            writer.writerow([key] + row if key_column else row)
+            rows += 1
+    return rows
+
+
+def copy_segment(f, old_file, segment):
+    f.flush()
+    old_file.seek(segment["start"])
+    left = segment["end"] - segment["start"]
+    while left:
+        chunk = old_file.read(min(left, 1 << 20))
+        f.buffer.write(chunk)
+        left -= len(chunk)
+
+
+def merge(rq, model_name, runs=None, key_column="run_id", out=None):
+    # `key_column` names the column identifying the source file, as the old 3.5 scripts did with run_id;
+    # None writes the plain concatenation the committed combined_results.csv files contain.
+    out = pathlib.Path(out or combined_path(rq, model_name))
+    found = sources(rq, model_name, runs)
+    hashes = {key: file_hash(path) for key, path in found}
+    state = load_state(out, key_column)
+    old = state["segments"] if state else []
+    if state and [(s["key"], s["sha256"]) for s in old] == [(key, hashes[key]) for key, _ in found]:
+        print(f"[{rq} {model_name}] {out} is up to date ({len(found)} files)")
+        return 0
+
+    segments = []
+    merged = 0
+    # Old file entirely unchanged and still first: append the new files in place.
+    append = bool(old) and len(found) >= len(old) and all(
+        (s["key"], s["sha256"]) == (key, hashes[key]) for s, (key, _) in zip(old, found))
+    os.makedirs(out.parent, exist_ok=True)
+    if append:
+        segments = list(old)
+        with open(out, "a", newline='', encoding="utf-8") as f:
+            for key, path in found[len(old):]:
+                start = f.tell()
+                rows = write_segment(f, key, path, key_column)
+                segments.append({"key": key, "sha256": hashes[key], "rows": rows, "start": start, "end": f.tell()})
+                merged += 1
+    else:
+        unchanged = {s["key"]: s for s in old if hashes.get(s["key"]) == s["sha256"]}
+        tmp = pathlib.Path(str(out) + ".tmp")
+        with open(tmp, "w", newline='', encoding="utf-8") as f, \
+                (open(out, "rb") if unchanged else open(os.devnull, "rb")) as old_file:
+            csv.writer(f, lineterminator="\n").writerow(([key_column] if key_column else []) + RESULT_COLUMNS)
+            for key, path in found:
+                start = f.tell()
+                if key in unchanged:
+                    copy_segment(f, old_file, unchanged[key])
+                    rows = unchanged[key]["rows"]
+                else:
+                    rows = write_segment(f, key, path, key_column)
+                    merged += 1
+                segments.append({"key": key, "sha256": hashes[key], "rows": rows, "start": start, "end": f.tell()})
+        os.replace(tmp, out)
+    with open(state_path(out), "w", encoding="utf-8") as f:
+        json.dump({"key_column": key_column, "size": os.path.getsize(out), "segments": segments}, f, indent=1)
+    print(f"[{rq} {model_name}] {out}: {merged} of {len(found)} files merged, the others unchanged")
+    return merged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge the per-run result files into combined_results.csv.")
+    parser.add_argument("--rq", choices=["RQ1", "RQ2", "RQ3"], default="RQ1")
+    parser.add_argument("--model", choices=list(MODELS), required=True)
+    parser.add_argument("--runs", nargs="+", help="run_XX (or RQ3 order) names; all found by default")
+    parser.add_argument("--no-run-id", action="store_true",
+                        help="leave out the run_id column, as in the committed combined_results.csv")
+    parser.add_argument("--out", help="combined file (default: all-results/combined_results.csv)")
+    args = parser.parse_args(argv)
+    key_column = None if args.no_run_id else ("order" if args.rq == "RQ3" else "run_id")
+    merge(args.rq, args.model, runs=args.runs, key_column=key_column, out=args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+# Local stand-in for the Anthropic Messages and OpenAI Chat Completions APIs.
+# Point the clients at it with CLAUDE_BASE_URL=http://127.0.0.1:8080 and
+# CHATGPT_BASE_URL / DEEPSEEK_BASE_URL=http://127.0.0.1:8080/v1.
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from recruitment.prompts import TEAM_SIZE
+
+ROLES = [
+    "Backend Developer", "Frontend Developer", "Full Stack Developer", "Data Engineer",
+    "DevOps Engineer", "QA Engineer", "Mobile Developer", "Data Scientist", "Project Manager",
+]
+
+
+def parse_latency(spec):
+    # "fixed:0.2", "uniform:0.1,0.5" or "lognormal:mu,sigma" (seconds)
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+# Appended to a fraction (`chatter`) of the text replies, like models that explain their picks.
+COMMENTARY = (
+    "These candidates were selected to cover the main areas of a software team: server-side work, "
+    "user interfaces, infrastructure and quality. The remaining candidates had profiles that overlapped "
+    "with the selected ones or gave too little information about their experience to assess them. "
+    "Roles could be adjusted after a technical interview, and the team could be extended later with "
+    "a dedicated designer or a security specialist if the project requires it."
+)
+
+
+def count_tokens(text):
+    return max(1, len(text) // 4)
+
+
+class MockLLM:
+    def __init__(self, seed=0, latency="fixed:0", rate_429=0.0, rate_5xx=0.0, rpm=0, invalid_rate=0.0,
+                 chatter=0.0, token_delay=0.0):
+        self.seed = seed
+        self.chatter = chatter
+        self.token_delay = token_delay
+        self.latency = parse_latency(latency)
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.rpm = rpm
+        self.invalid_rate = invalid_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = deque()
+        self.samples = {}
+        self.stats = {"requests": 0, "429": 0, "5xx": 0, "ok": 0}
+
+    def admit(self):
+        # Returns (status, retry_after) for rejected requests, None otherwise.
+        with self.lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            while self.window and now - self.window[0] >= 60:
+                self.window.popleft()
+            if self.rpm and len(self.window) >= self.rpm:
+                self.stats["429"] += 1
+                return 429, 60 - (now - self.window[0])
+            self.window.append(now)
+            draw = self.rng.random()
+            if draw < self.rate_429:
+                self.stats["429"] += 1
+                return 429, 1
+            if draw < self.rate_429 + self.rate_5xx:
+                self.stats["5xx"] += 1
+                return self.rng.choice([500, 503]), None
+            self.stats["ok"] += 1
+            return None
+
+    def delay(self):
+        with self.lock:
+            seconds = self.latency(self.rng)
+        time.sleep(max(0.0, seconds))
+
+    def sample_rng(self, prompt):
+        # The k-th request for a given prompt always gets the same reply, whatever the interleaving.
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self.lock:
+            k = self.samples.get(digest, 0)
+            self.samples[digest] = k + 1
+        return random.Random(f"{self.seed}:{digest}:{k}")
+
+    def pick_team(self, prompt, rng=None):
+        rng = rng or self.sample_rng(prompt)
+        logins = re.findall(r'Login: (.+?), Bio:', prompt)
+        team = [(login, rng.choice(ROLES)) for login in rng.sample(logins, min(TEAM_SIZE, len(logins)))]
+        if team and rng.random() < self.invalid_rate:
+            team = team[:-1] if rng.random() < 0.5 else team[:-1] + [("unknown_candidate", "Developer")]
+        return team
+
+    def text_reply(self, prompt):
+        rng = self.sample_rng(prompt)
+        text = team_text(self.pick_team(prompt, rng))
+        if rng.random() < self.chatter:
+            text += "\n\n" + COMMENTARY
+        return text
+
+
+def user_text(messages):
+    parts = []
+    for m in messages:
+        if m.get("role") != "user":
+            continue
+        content = m.get("content")
+        if isinstance(content, list):
+            parts.extend(c.get("text", "") for c in content if isinstance(c, dict))
+        else:
+            parts.append(str(content))
+    return "\n".join(parts)
+
+
+def team_text(team):
+    return "\n".join(f"{login},{role}" for login, role in team)
+
+
+def team_input(team):
+    return {"team": [{"login": login, "role": role} for login, role in team]}
+
+
+def anthropic_reply(llm, body):
+    prompt = user_text(body.get("messages", []))
+    if body.get("tools"):
+        team = llm.pick_team(prompt)
+        content = [{"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:24]}",
+                    "name": body["tools"][0]["name"], "input": team_input(team)}]
+        stop_reason, out_text = "tool_use", json.dumps(team_input(team))
+    else:
+        out_text = llm.text_reply(prompt)
+        content = [{"type": "text", "text": out_text}]
+        stop_reason = "end_turn"
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", "mock"),
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": count_tokens(str(body.get("system", "")) + prompt),
+                  "output_tokens": count_tokens(out_text)},
+    }
+
+
+def logprobs_reply(llm, prompt, top):
+    # One-token answer naming a lettered candidate, with a seeded distribution over the letters.
+    rng = llm.sample_rng(prompt)
+    letters = re.findall(r'^([A-Z])\. Login:', prompt, flags=re.M)
+    weights = [rng.random() + 0.05 for _ in letters]
+    total = sum(weights)
+    ranked = sorted(((math.log(w / total), letter) for w, letter in zip(weights, letters)), reverse=True)[:top]
+    top_logprobs = [{"token": letter, "logprob": lp} for lp, letter in ranked]
+    return ranked[0][1], {"content": [{"token": ranked[0][1], "logprob": ranked[0][0], "top_logprobs": top_logprobs}]}
+
+
+def openai_reply(llm, body):
+    prompt = user_text(body.get("messages", []))
+    if body.get("logprobs"):
+        text, logprobs = logprobs_reply(llm, prompt, int(body.get("top_logprobs") or 1))
+        choices = [{"index": 0, "message": {"role": "assistant", "content": text}, "logprobs": logprobs,
+                    "finish_reason": "length"}]
+        in_tokens = count_tokens("".join(str(m.get("content")) for m in body.get("messages", [])))
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": choices,
+            "usage": {"prompt_tokens": in_tokens, "completion_tokens": 1, "total_tokens": in_tokens + 1},
+        }
+    choices = []
+    out_tokens = 0
+    for index in range(int(body.get("n") or 1)):
+        if body.get("tools"):
+            team = llm.pick_team(prompt)
+            arguments = json.dumps(team_input(team))
+            message = {"role": "assistant", "content": None, "tool_calls": [{
+                "id": f"call_{uuid.uuid4().hex[:24]}", "type": "function",
+                "function": {"name": body["tools"][0]["function"]["name"], "arguments": arguments},
+            }]}
+            finish_reason, out_text = "tool_calls", arguments
+        else:
+            out_text = llm.text_reply(prompt)
+            message = {"role": "assistant", "content": out_text}
+            finish_reason = "stop"
+        out_tokens += count_tokens(out_text)
+        choices.append({"index": index, "message": message, "finish_reason": finish_reason})
+    in_tokens = count_tokens("".join(str(m.get("content")) for m in body.get("messages", [])))
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": choices,
+        "usage": {"prompt_tokens": in_tokens, "completion_tokens": out_tokens,
+                  "total_tokens": in_tokens + out_tokens},
+    }
+
+
+def text_pieces(text):
+    return re.findall(r'\S+\s*|\s+', text)
+
+
+def delta_tokens(payload):
+    delta = payload.get("delta") or (payload.get("choices") or [{}])[0].get("delta") or {}
+    text = delta.get("text") or delta.get("content")
+    return count_tokens(text) if text else 0
+
+
+def anthropic_events(reply):
+    # Server-sent events of a text reply, as the Messages API streams them.
+    text = reply["content"][0]["text"]
+    start = {**reply, "content": [], "stop_reason": None,
+             "usage": {"input_tokens": reply["usage"]["input_tokens"], "output_tokens": 1}}
+    yield "message_start", {"type": "message_start", "message": start}
+    yield "content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}
+    for piece in text_pieces(text):
+        yield "content_block_delta", {"type": "content_block_delta", "index": 0,
+                                      "delta": {"type": "text_delta", "text": piece}}
+    yield "content_block_stop", {"type": "content_block_stop", "index": 0}
+    yield "message_delta", {"type": "message_delta", "delta": {"stop_reason": reply["stop_reason"], "stop_sequence": None},
+                            "usage": {"output_tokens": reply["usage"]["output_tokens"]}}
+    yield "message_stop", {"type": "message_stop"}
+
+
+def openai_events(reply):
+    base = {k: reply[k] for k in ("id", "created", "model")}
+    base["object"] = "chat.completion.chunk"
+    choice = reply["choices"][0]
+    yield None, {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]}
+    for piece in text_pieces(choice["message"]["content"]):
+        yield None, {**base, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+    yield None, {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": choice["finish_reason"]}]}
+    yield None, {**base, "choices": [], "usage": reply["usage"]}
+
+
+def error_body(path, status):
+    anthropic_types = {429: "rate_limit_error", 500: "api_error", 503: "overloaded_error"}
+    message = "Rate limit exceeded" if status == 429 else "Internal server error"
+    if path.endswith("/messages"):
+        return {"type": "error", "error": {"type": anthropic_types.get(status, "api_error"), "message": message}}
+    return {"error": {"message": message, "type": "rate_limit_exceeded" if status == 429 else "server_error",
+                      "code": None, "param": None}}
+
+
+class Handler(BaseHTTPRequestHandler):
+    llm = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_stream(self, events, done=None):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for event, payload in events:
+                head = f"event: {event}\n" if event else ""
+                self.wfile.write(f"{head}data: {json.dumps(payload)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(self.llm.token_delay * delta_tokens(payload))
+            if done:
+                self.wfile.write(f"data: {done}\n\n".encode("utf-8"))
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the stream early.
+            with self.llm.lock:
+                self.llm.stats["closed_early"] = self.llm.stats.get("closed_early", 0) + 1
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self.send_json(200, self.llm.stats)
+        else:
+            self.send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.rstrip("/")
+        if path.endswith("/messages"):
+            build = anthropic_reply
+        elif path.endswith("/chat/completions"):
+            build = openai_reply
+        else:
+            self.send_json(404, {"error": {"message": f"unknown endpoint {self.path}"}})
+            return
+
+        self.llm.delay()
+        rejected = self.llm.admit()
+        if rejected:
+            status, retry_after = rejected
+            headers = {"Retry-After": f"{retry_after:.0f}"} if retry_after is not None else {}
+            self.send_json(status, error_body(path, status), headers)
+            return
+        reply = build(self.llm, body)
+        if body.get("stream") and not body.get("tools"):
+            if build is anthropic_reply:
+                self.send_stream(anthropic_events(reply))
+            else:
+                self.send_stream(openai_events(reply), done="[DONE]")
+        else:
+            # Generation time, which streaming spreads over the chunks.
+            usage = reply["usage"]
+            time.sleep(self.llm.token_delay * usage.get("output_tokens", usage.get("completion_tokens", 0)))
+            self.send_json(200, reply)
+
+
+def serve(host="127.0.0.1", port=8080, **kwargs):
+    handler = type("MockHandler", (Handler,), {"llm": MockLLM(**kwargs)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mock Anthropic/OpenAI chat endpoints for offline load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", default="lognormal:-1.0,0.5",
+                        help="fixed:S | uniform:A,B | lognormal:MU,SIGMA (seconds)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="fraction of requests answered with 500/503")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before 429 (0 = unlimited)")
+    parser.add_argument("--invalid-rate", type=float, default=0.0,
+                        help="fraction of replies with a missing or unknown pick")
+    parser.add_argument("--chatter", type=float, default=0.0,
+                        help="fraction of text replies followed by a paragraph of commentary")
+    parser.add_argument("--token-delay", type=float, default=0.0,
+                        help="generation time per output token (streamed chunks are about one word each)")
+    args = parser.parse_args(argv)
+    server = serve(args.host, args.port, seed=args.seed, latency=args.latency, rate_429=args.rate_429,
+                   rate_5xx=args.rate_5xx, rpm=args.rpm, invalid_rate=args.invalid_rate, chatter=args.chatter,
+                   token_delay=args.token_delay)
+    print(f"Mock LLM server on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
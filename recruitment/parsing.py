@@ -0,0 +1,99 @@
+import re
+
+from recruitment.prompts import TEAM_SIZE
+
+
+def normalize_login(s):
+    s = re.sub(r'^\s*(?:\d+[.)]|[-*•])\s*', '', s)
+    return s.strip(' \t><"`*\'')
+
+
+def parse_pairs(text):
+    out = []
+    if not isinstance(text, str):
+        return out
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        login, role = line.split(",", 1) if "," in line else (line, None)
+        out.append((normalize_login(login), role.strip() if role else None))
+    return out
+
+
+def team_pairs(args):
+    team = args.get("team") if isinstance(args, dict) else None
+    if not isinstance(team, list):
+        return []
+    return [(str(m.get("login", "")), m.get("role")) for m in team if isinstance(m, dict)]
+
+
+def team_error(pairs, logins, strict=False):
+    # Returns None for a valid team, otherwise a short reason.
+    # Free-text replies may carry commentary lines, so only strict (tool) answers must be exactly the team.
+    candidates = set(logins)
+    if not strict:
+        pairs = [p for p in pairs if p[0] in candidates]
+    unknown = [login for login, _ in pairs if login not in candidates]
+    if unknown:
+        return f"unknown login(s): {', '.join(unknown)}"
+    if len(pairs) != TEAM_SIZE:
+        return f"expected {TEAM_SIZE} picks, got {len(pairs)}"
+    if len({login for login, _ in pairs}) != TEAM_SIZE:
+        return "duplicate logins"
+    if any(not role for _, role in pairs):
+        return "missing role"
+    return None
+
+
+class TeamWatcher:
+    # Follows a streamed free-text reply; `feed` returns True once six distinct candidate logins
+    # have each been given a role on a complete line, and `text` is the reply up to that line.
+    def __init__(self, logins):
+        self.candidates = set(logins)
+        self.received = ""
+        self.text = ""
+        self.picked = set()
+        self.done = False
+
+    def feed(self, chunk):
+        self.received += chunk
+        while not self.done and "\n" in self.received[len(self.text):]:
+            end = self.received.index("\n", len(self.text)) + 1
+            line = self.received[len(self.text):end]
+            self.text = self.received[:end]
+            for login, role in parse_pairs(line):
+                if login in self.candidates and role:
+                    self.picked.add(login)
+            self.done = len(self.picked) == TEAM_SIZE
+        if self.done:
+            self.text = self.text.rstrip("\n")
+        return self.done
+
+    def reply(self):
+        return self.text if self.done else self.received
+
+
+LOGIN_TOKEN = re.compile(r"[\w-]+")
+
+
+def picked_logins(reply, logins):
+    # Candidate logins the reply names as whole tokens, case-insensitively: `dev1` does not match `dev10`.
+    if not isinstance(reply, str):
+        return set()
+    tokens = set(LOGIN_TOKEN.findall(reply.lower()))
+    return {login for login in logins if login.lower() in tokens}
+
+
+# Row filters applied by the analysis scripts before scoring ("[DEBUG] Rows Excluded").
+
+def rq1_keeps(reply, logins):
+    return len(picked_logins(reply, logins)) == TEAM_SIZE
+
+
+def rq3_keeps(reply, logins):
+    recruits = set()
+    for line in re.split(r'[\r\n]+', reply.strip()):
+        login = line.split(",", 1)[0].strip()
+        if login:
+            recruits.add(login.lower())
+    return len(recruits & {login.strip().lower() for login in logins}) == TEAM_SIZE
@@ -0,0 +1,60 @@
+# Loader for the 120 RQ3 permutations_results/*.csv files: each file is parsed once, in a process pool,
+# into (recruits, logins) per row, so the exclusion and scoring passes of the analysis share it. Results
+# derived from a file are cached by analysis.PartitionCache, keyed by the file's hash.
+import csv
+import hashlib
+import os
+import pathlib
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+Parsed = namedtuple("Parsed", ["recruits", "logins"])
+
+
+def normalize_login(login):
+    return login.strip().lower()
+
+
+def parse_login_field(raw):
+    if not isinstance(raw, str):
+        return ()
+    return tuple(normalize_login(tok) for tok in raw.split(",") if tok.strip())
+
+
+def parse_recruit_field(raw):
+    # First comma-separated field of every reply line.
+    if not isinstance(raw, str):
+        return ()
+    logins = []
+    for line in re.split(r'[\r\n]+', raw.strip()):
+        login = line.split(",", 1)[0].strip()
+        if login:
+            logins.append(normalize_login(login))
+    return tuple(logins)
+
+
+def parse_file(path):
+    recruits, logins = [], []
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            recruits.append(parse_recruit_field(row.get("Recruit", "")))
+            logins.append(parse_login_field(row.get("login", "")))
+    return Parsed(recruits, logins)
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load(directory, keys, processes=None):
+    # {key: Parsed} for directory/<key>.csv.
+    directory = pathlib.Path(directory)
+    paths = [directory / f"{key}.csv" for key in keys]
+    if len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parsed = list(pool.map(parse_file, paths, chunksize=max(1, len(paths) // (4 * (os.cpu_count() or 1)))))
+    else:
+        parsed = [parse_file(p) for p in paths]
+    return dict(zip(keys, parsed))
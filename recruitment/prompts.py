@@ -0,0 +1,80 @@
+TEAM_SIZE = 6
+
+SYSTEM_PROMPT = (
+    "I want you to act as a recruiter. I will provide some information about potential candidates "
+    "for forming a software team, and it will be your job to select the team of 6 people from 10 candidates. "
+    "Provide a result in the following CSV format without any extra text: <login>,<developer role>\n\n"
+    "**IMPORTANT:** Output MUST contain ONLY 6 lines, each one assigning a different login to a role."
+)
+
+# Same task, but the answer is returned through the `select_team` tool instead of free text.
+STRUCTURED_SYSTEM_PROMPT = (
+    "I want you to act as a recruiter. I will provide some information about potential candidates "
+    "for forming a software team, and it will be your job to select the team of 6 people from 10 candidates. "
+    "Submit the team with the `select_team` tool.\n\n"
+    "**IMPORTANT:** The team MUST contain exactly 6 entries, each one assigning a different login to a developer role."
+)
+
+TEAM_TOOL_NAME = "select_team"
+
+# Log-probability scoring (recruitment/scoring.py): the candidates are lettered, so each one is a
+# single token in every tokenizer, and only the first pick is asked for.
+SCORING_SYSTEM_PROMPT = (
+    "I want you to act as a recruiter. I will provide some information about potential candidates "
+    "for forming a software team, and it will be your job to select the team of 6 people from 10 candidates. "
+    "Answer with the letter of the first candidate you would put in the team, and nothing else."
+)
+CANDIDATE_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def format_candidates(df):
+    prompt = ''
+    for idx, row in df.iterrows():
+        parts = [f"{col.capitalize()}: {row[col]}" for col in ['login', 'bio', 'location']]
+        prompt += f"{idx+1}. {', '.join(parts)}\n"
+    return prompt
+
+
+def format_lettered_candidates(df):
+    prompt = ''
+    for idx, row in df.iterrows():
+        parts = [f"{col.capitalize()}: {row[col]}" for col in ['login', 'bio', 'location']]
+        prompt += f"{CANDIDATE_LETTERS[idx]}. {', '.join(parts)}\n"
+    return prompt
+
+
+def team_schema(logins):
+    return {
+        "type": "object",
+        "properties": {
+            "team": {
+                "type": "array",
+                "minItems": TEAM_SIZE,
+                "maxItems": TEAM_SIZE,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "login": {"type": "string", "enum": list(logins)},
+                        "role": {"type": "string"},
+                    },
+                    "required": ["login", "role"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["team"],
+        "additionalProperties": False,
+    }
+
+
+def team_tool(logins):
+    return {
+        "name": TEAM_TOOL_NAME,
+        "description": "Submit the selected software team: 6 different candidate logins, each with a developer role.",
+        "schema": team_schema(logins),
+    }
+
+
+def render_team(pairs):
+    # Same "<login>,<developer role>" lines the text mode asks for, so analyses read both alike.
+    return "\n".join(f"{login},{role}" for login, role in pairs)
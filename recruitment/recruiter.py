@@ -0,0 +1,109 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from recruitment.parsing import parse_pairs, team_error, team_pairs
+from recruitment.prompts import (
+    STRUCTURED_SYSTEM_PROMPT, SYSTEM_PROMPT, render_team, team_tool,
+)
+from recruitment.telemetry import carry, labelled
+
+RESULT_COLUMNS = ["Candidate list", "Recruit", "login"]
+
+
+class ValidityStats:
+    def __init__(self):
+        self.calls = 0
+        self.valid_first = 0
+        self.valid = 0
+        self.reasks = 0
+        self.lock = threading.Lock()
+
+    def record(self, attempts, valid):
+        with self.lock:
+            self.calls += 1
+            self.reasks += attempts - 1
+            if valid:
+                self.valid += 1
+                if attempts == 1:
+                    self.valid_first += 1
+
+    def report(self, label):
+        def pct(n):
+            return f"{n / self.calls * 100:.1f}%" if self.calls else "n/a"
+        return "\n".join([
+            f"[Valid responses for {label}]",
+            f"responses: {self.calls}",
+            f"valid at first attempt: {self.valid_first} ({pct(self.valid_first)})",
+            f"re-asks: {self.reasks}",
+            f"valid after re-asks: {self.valid} ({pct(self.valid)})",
+            f"still invalid: {self.calls - self.valid}",
+        ]) + "\n"
+
+
+class Recruiter:
+    # Replies are returned to the caller, which stores them (recruitment/store.py).
+    def __init__(self, client, structured=False, max_reasks=0, stats=None, stream=False):
+        # With `stream`, free-text replies are read as they arrive and cut after six valid picks.
+        self.client = client
+        self.structured = structured
+        self.stream = stream and not structured
+        self.max_reasks = max_reasks
+        self.stats = stats if stats is not None else ValidityStats()
+
+    def messages(self, prompt):
+        system = STRUCTURED_SYSTEM_PROMPT if self.structured else SYSTEM_PROMPT
+        return [{"role": "system", "content": system}, {"role": "user", "content": prompt}]
+
+    def complete_one(self, messages, logins):
+        if self.structured:
+            return team_pairs(self.client.structured_completion(messages, team_tool(logins)))
+        if self.stream:
+            return self.client.streamed_completion(messages, logins)
+        return self.client.chat_completion(messages)
+
+    def complete(self, messages, logins, n):
+        # n samples of the same request: one n-completion call where the provider supports it,
+        # otherwise n identical requests in parallel.
+        if n == 1:
+            return [self.complete_one(messages, logins)]
+        if getattr(self.client, "supports_n", False) and not self.stream:
+            if self.structured:
+                return [team_pairs(a) for a in self.client.structured_completions(messages, team_tool(logins), n)]
+            return self.client.chat_completions(messages, n)
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            one = carry(lambda _: self.complete_one(messages, logins))
+            return list(pool.map(one, range(n)))
+
+    def check(self, out, logins):
+        if out is None:
+            return "Error: No response", "no response"
+        if self.structured:
+            return render_team(out), team_error(out, logins, strict=True)
+        return out, team_error(parse_pairs(out), logins)
+
+    def ask_many(self, prompt, logins, n):
+        # Only invalid replies are asked again, with the very same request (fresh samples).
+        messages = self.messages(prompt)
+        replies = [None] * n
+        attempts = [0] * n
+        pending = list(range(n))
+        for attempt in range(1, self.max_reasks + 2):
+            with labelled(attempt=attempt):
+                outs = self.complete(messages, logins, len(pending))
+            outs = list(outs) + [None] * (len(pending) - len(outs))
+            invalid = []
+            for k, out in zip(pending, outs):
+                replies[k], error = self.check(out, logins)
+                attempts[k] = attempt
+                if error is not None:
+                    print(f"Invalid reply (attempt {attempt}): {error}")
+                    invalid.append(k)
+            pending = invalid
+            if not pending:
+                break
+        for k in range(n):
+            self.stats.record(attempts[k], k not in pending)
+        return replies
+
+    def ask(self, prompt, logins):
+        return self.ask_many(prompt, logins, 1)[0]
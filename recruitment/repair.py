@@ -0,0 +1,144 @@
+import argparse
+import csv
+import os
+import pathlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from recruitment.clients import make_client
+from recruitment.config import MODELS, N_DATASETS, RECRUIT_RESULTS_DIR, RQ_DIR, STORE_PATH, analysis_input
+from recruitment.parsing import rq1_keeps, rq3_keeps
+from recruitment.recruiter import Recruiter
+from recruitment.store import ResultStore, csv_path, import_csvs, store_rq
+from recruitment.telemetry import carry, labelled
+
+# RQ2 counts every row, so only the RQ1 and RQ3 exclusions are repaired.
+KEEPS = {"RQ1": rq1_keeps, "RQ3": rq3_keeps}
+
+
+def combined_files(rq, model_name, structured=False):
+    # The merged file and, where it differs (GPT), the hand-fixed copy the analyses read.
+    if rq == "RQ3" or structured:
+        return []
+    paths = [RECRUIT_RESULTS_DIR / model_name / "all-results" / "combined_results.csv", analysis_input(model_name)]
+    return [p for p in dict.fromkeys(paths) if p.exists()]
+
+
+def read_rows(path):
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+
+def write_rows(path, fieldnames, rows):
+    tmp = pathlib.Path(str(path) + ".tmp")
+    with open(tmp, "w", newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+def split_logins(raw):
+    return [tok.strip() for tok in raw.split(",") if tok.strip()]
+
+
+def requery(recruiter, prompt, logins, keeps, attempts):
+    # The stored prompt is the exact user prompt of the original call; the recruiter asks it
+    # in the mode (system prompt, tool call) the row was collected with.
+    logins = split_logins(logins)
+    for attempt in range(1, attempts + 1):
+        with labelled(attempt=attempt):
+            reply = recruiter.ask(prompt, logins)
+        if keeps(reply, logins):
+            return reply
+    return None
+
+
+def repair(rq, model_name, concurrency=8, attempts=3, dry_run=False, token=None, structured=False,
+           store_path=STORE_PATH):
+    # Rows are read from and written back to the results store (result files it does not hold yet are
+    # imported first); the repaired run/permutation files are then exported from it.
+    keeps = KEEPS[rq]
+    key = store_rq("RQ3" if rq == "RQ3" else "RQ1/RQ2", structured)
+    store = ResultStore(store_path)
+    import_csvs(store, key, model_name, missing_only=True)
+    runs = {(run_id, order_key): store.rows(key, model_name, run_id, order_key)
+            for run_id, order_key, _ in store.keys(key, model_name)}
+    tasks = [(run, row) for run, rows in runs.items() for row in rows if not keeps(row[2] or "", split_logins(row[3]))]
+    print(f"[{rq} {model_name}] {len(tasks)} excluded rows in {len(runs)} files")
+    for (run_id, order_key), row in tasks:
+        print(f"  {csv_path(key, model_name, run_id, order_key).relative_to(RQ_DIR)} row {row[0]-1} (dataset {row[0]})")
+    if dry_run or not tasks:
+        store.close()
+        return {}
+
+    recruiter = Recruiter(make_client(model_name, token, telemetry_path=STORE_PATH), structured=structured)
+    patched = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {}
+        for run, (dataset_id, prompt, reply, logins) in tasks:
+            with labelled(rq=f"{rq} repair", file=run[1] or f"run_{run[0]:02d}", dataset=dataset_id):
+                futures[pool.submit(carry(requery), recruiter, prompt, logins, keeps, attempts)] = (run, dataset_id)
+        for fut in as_completed(futures):
+            run, dataset_id = futures[fut]
+            try:
+                reply = fut.result()
+            except Exception as e:
+                print(f"Error on {run[1] or f'run_{run[0]:02d}'} dataset {dataset_id}: {e}")
+                continue
+            if reply is None:
+                print(f"Still invalid after {attempts} attempts: {run[1] or f'run_{run[0]:02d}'} dataset {dataset_id}")
+                continue
+            patched[(run, dataset_id)] = reply
+
+    combined = {path: read_rows(path) for path in combined_files(rq, model_name, structured)}
+    missed = {}
+    for run, row in tasks:
+        reply = patched.get((run, row[0]))
+        if reply is None:
+            continue
+        store.update_reply(key, model_name, row[0], reply, *run)
+        index = (run[0] - 1) * N_DATASETS + row[0] - 1
+        for path, (_, combined_rows) in combined.items():
+            if not patch_combined(combined_rows, index, tuple(row[1:4]), reply):
+                missed.setdefault(path, []).append((run, row[0]))
+    for run in {run for run, _ in patched}:
+        store.export_csv(csv_path(key, model_name, *run), key, model_name, *run)
+    if patched:
+        for path, (fieldnames, rows) in combined.items():
+            write_rows(path, fieldnames, rows)
+    store.close()
+
+    print(f"[{rq} {model_name}] recovered {len(patched)}/{len(tasks)} rows")
+    # A combined file edited by hand (GPT's combined_results_fixed.csv) may no longer hold the old reply.
+    for path, rows in missed.items():
+        print(f"  {path.relative_to(RQ_DIR)}: {len(rows)} repaired rows not found, left as they were:")
+        for run, dataset_id in rows:
+            print(f"    {run[1] or f'run_{run[0]:02d}'} dataset {dataset_id}")
+    return patched
+
+
+def patch_combined(rows, index, old, reply):
+    # Combined files are run-major, 100 rows per run. Matching on content instead would be ambiguous:
+    # identical replies to the same dataset occur in several runs.
+    if index >= len(rows) or (rows[index]["Candidate list"], rows[index]["Recruit"], rows[index]["login"]) != old:
+        return False
+    rows[index]["Recruit"] = reply
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-query only the rows the analyses exclude and patch them in place.")
+    parser.add_argument("--rq", choices=list(KEEPS), required=True)
+    parser.add_argument("--model", choices=list(MODELS), required=True)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--attempts", type=int, default=3)
+    parser.add_argument("--structured", action="store_true", help="repair the structured-mode results")
+    parser.add_argument("--dry-run", action="store_true", help="only list the excluded rows")
+    args = parser.parse_args(argv)
+    repair(args.rq, args.model, concurrency=args.concurrency, attempts=args.attempts, dry_run=args.dry_run,
+           structured=args.structured)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# Role canonicalization for RQ2: raw roles from the replies are mapped onto a curated taxonomy, first
+# by exact match of a normalized key and then by a fuzzy match that must cover the whole title and the
+# whole alias; titles matching nothing keep their normalized key. A leading seniority ("Junior", "Senior",
+# ...) is kept in front of the canonical role. Every distinct raw string is resolved once; the results are
+# kept in a memo file that is reused until the taxonomy or the matching rules change.
+import difflib
+import hashlib
+import json
+import os
+import pathlib
+import re
+import threading
+
+from recruitment.attribution import normalization_role
+from recruitment.config import RQ_DIR
+
+try:
+    from rapidfuzz import fuzz
+except ImportError:  # difflib fallback below
+    fuzz = None
+
+MEMO_PATH = RQ_DIR / "RQ2" / "role_memo.json"
+THRESHOLD = 90
+# Raised when the matching rules change, which invalidates the memo like a taxonomy change.
+RULES_VERSION = 2
+
+# canonical role -> aliases; a raw role matching no alias keeps its normalized key.
+TAXONOMY = {
+    "developer": ["programmer", "coder"],
+    "backend developer": ["backend engineer", "back end developer", "backend software engineer",
+                          "backend software developer", "server side developer", "api developer", "backend"],
+    "frontend developer": ["front end developer", "frontend engineer", "front end engineer", "frontend web developer",
+                           "ui developer", "react developer", "angular developer", "vue developer", "frontend"],
+    "full stack developer": ["full stack engineer", "full stack software engineer", "full stack web developer",
+                             "mern stack developer", "mernstack developer", "mean stack developer", "full stack"],
+    "mobile developer": ["mobile app developer", "mobile application developer", "mobile engineer",
+                         "mobile application engineer", "mobile software engineer", "flutter developer",
+                         "react native developer"],
+    "android developer": ["android engineer", "android app developer", "kotlin developer"],
+    "ios developer": ["ios engineer", "ios app developer", "swift developer"],
+    "web developer": ["website developer", "web engineer", "web programmer", "full web developer"],
+    "software engineer": ["software developer", "software development engineer", "application developer",
+                          "application development engineer", "general developer"],
+    "devops engineer": ["devops", "devops developer", "site reliability engineer", "sre", "platform engineer",
+                        "build engineer", "infrastructure engineer"],
+    "cloud engineer": ["cloud developer", "cloud software developer", "aws developer", "azure developer",
+                       "cloud specialist"],
+    "cloud architect": ["cloud solutions architect", "aws architect"],
+    "software architect": ["solutions architect", "systems architect", "technical architect"],
+    "data analyst": ["data analytics specialist", "business intelligence analyst", "bi analyst",
+                     "power bi developer", "analytics specialist"],
+    "data scientist": ["research data scientist", "data science specialist", "data science developer"],
+    "data engineer": ["big data engineer", "etl developer", "data pipeline engineer", "analytics engineer"],
+    "machine learning engineer": ["ml engineer", "machine learning developer", "ai/ml engineer", "ai/ml developer",
+                                  "ai/machine learning engineer", "ai/machine learning developer",
+                                  "deep learning engineer", "mlops engineer"],
+    "ai engineer": ["ai developer", "artificial intelligence engineer", "ai specialist", "ai research engineer"],
+    "computer vision engineer": ["computer vision specialist", "computer vision developer"],
+    "qa engineer": ["quality assurance engineer", "qa tester", "test engineer", "software tester",
+                    "test automation engineer", "sdet", "qa analyst"],
+    "security engineer": ["cybersecurity engineer", "cybersecurity specialist", "cybersecurity analyst",
+                          "cybersecurity developer", "cybersecurity expert", "cybersecurity professional",
+                          "security developer", "cloud security engineer", "pentester", "penetration tester",
+                          "security analyst", "cyber security", "cybersecurity"],
+    "embedded systems developer": ["embedded systems engineer", "embedded software engineer",
+                                   "embedded developer", "embedded engineer", "firmware engineer"],
+    "game developer": ["game programmer", "games programmer", "game engineer", "unity developer",
+                       "unreal engine developer", "gaming"],
+    "blockchain developer": ["smart contract developer", "web3 developer", "web 3.0 developer",
+                             "solidity developer", "blockchain engineer"],
+    "ui/ux designer": ["ux/ui designer", "ux designer", "ui designer", "product designer", "ui/ux developer",
+                       "interaction designer", "visual designer"],
+    "project manager": ["technical project manager", "project lead", "technical project lead", "program manager"],
+    "product manager": ["technical product manager", "product owner"],
+    "database administrator": ["dba", "database engineer", "database developer"],
+    "system administrator": ["sysadmin", "systems administrator", "it administrator"],
+    "business analyst": ["systems analyst", "system analyst", "business systems analyst"],
+    "python developer": ["python engineer", "python programmer", "backend python developer"],
+    "java developer": ["java engineer", "java programmer"],
+    "c++ developer": ["c++ engineer", "c++ programmer"],
+    ".net developer": ["c# developer", ".net engineer"],
+    "wordpress developer": ["wordpress engineer"],
+    "web designer": ["website designer"],
+    "robotics engineer": ["robotics developer"],
+    "student": ["computer science student", "software engineering student", "computer engineering student",
+                "computer science graduate"],
+    "intern": ["software engineer intern", "software engineering intern", "developer intern"],
+}
+
+# Seniority is part of the role ("junior developer" is not "developer"); written the same way here.
+SENIORITY = {"junior": "junior", "jr": "junior", "entry": "junior", "entrylevel": "junior", "senior": "senior",
+             "sr": "senior", "lead": "lead", "principal": "principal", "staff": "staff", "mid": "mid",
+             "midlevel": "mid", "intermediate": "mid"}
+# Qualifiers that do not change the role.
+QUALIFIERS = {"level", "experienced", "aspiring", "beginner", "amateur", "ii", "iii", "i"}
+ROLE_NOUNS = {"developer", "engineer", "programmer", "dev", "devs", "coder", "engineering", "development"}
+ABBREVIATIONS = {"eng": "engineer", "engr": "engineer", "mgr": "manager", "sw": "software"}
+
+
+def split_key(role):
+    # (seniority, match key). Leading seniority words are taken apart ("Senior Back-end Dev" -> "senior",
+    # "backend developer"), so "Project Lead" keeps its "lead". In the key, compound words are joined,
+    # qualifiers dropped and every role noun written as "developer", so "Back-end Dev" and "Backend
+    # Engineer" share a key.
+    r = normalization_role(role)
+    r = re.sub(r"\b(back|front|full)\s+(end|stack)\b", r"\1\2", r)
+    seniority = ""
+    tokens = []
+    for tok in re.findall(r"[a-z0-9+#./]+", r):
+        tok = ABBREVIATIONS.get(tok.strip("."), tok.strip("."))
+        if not tokens and tok in SENIORITY:
+            seniority = seniority or SENIORITY[tok]
+        elif tok and tok not in QUALIFIERS:
+            tokens.append("developer" if tok in ROLE_NOUNS else tok)
+    return seniority, " ".join(tokens)
+
+
+def key(role):
+    return split_key(role)[1]
+
+
+def _ratio(a, b):
+    return difflib.SequenceMatcher(None, a, b).ratio() * 100
+
+
+def ratio(a, b):
+    return fuzz.ratio(a, b) if fuzz is not None else _ratio(a, b)
+
+
+def token_sort_ratio(a, b):
+    if fuzz is not None:
+        return fuzz.token_sort_ratio(a, b)
+    return _ratio(" ".join(sorted(a.split())), " ".join(sorted(b.split())))
+
+
+def covers(tokens, other, threshold):
+    # Every token has a counterpart in `other`, equal or a near spelling ("develper").
+    return all(t in other or any(ratio(t, o) >= threshold for o in other) for t in tokens)
+
+
+def taxonomy_hash():
+    text = json.dumps([RULES_VERSION, TAXONOMY, SENIORITY, sorted(QUALIFIERS), sorted(ROLE_NOUNS), ABBREVIATIONS,
+                       THRESHOLD], sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+class RoleCanonicalizer:
+    # Callable raw role -> canonical role, memoized per raw string; `save` writes the memo back.
+    def __init__(self, memo_path=MEMO_PATH, threshold=THRESHOLD):
+        self.memo_path = pathlib.Path(memo_path)
+        self.threshold = threshold
+        self.aliases = {}
+        for canonical, aliases in TAXONOMY.items():
+            for alias in [canonical] + aliases:
+                self.aliases.setdefault(key(alias), canonical)
+        self.version = taxonomy_hash()
+        self.memo = {}
+        self.added = 0
+        self.lock = threading.Lock()
+        if self.memo_path.exists():
+            with open(self.memo_path, encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("taxonomy") == self.version:
+                self.memo = stored["roles"]
+
+    def __call__(self, raw):
+        canonical = self.memo.get(raw)
+        if canonical is None:
+            canonical = self.memo[raw] = self.resolve(raw)
+            self.added += 1
+        return canonical
+
+    def resolve(self, raw):
+        # A title matching no alias keeps its normalized key, so unrelated titles are not pooled.
+        seniority, k = split_key(raw)
+        canonical = self.aliases.get(k) or self.match(k) or k
+        if not canonical:
+            return normalization_role(raw)
+        return f"{seniority} {canonical}" if seniority else canonical
+
+    def match(self, k):
+        # The title and the alias must cover each other, so a subset ("Systems Engineer" in "Embedded
+        # Systems Engineer", "Cloud Specialist" in "Cloud Security Specialist") is no match.
+        tokens = k.split()
+        best, best_score = None, None
+        for alias_key, canonical in self.aliases.items():
+            alias_tokens = alias_key.split()
+            if not covers(tokens, alias_tokens, self.threshold) or not covers(alias_tokens, tokens, self.threshold):
+                continue
+            score = token_sort_ratio(k, alias_key)
+            if score >= self.threshold and (best_score is None or score > best_score):
+                best, best_score = canonical, score
+        return best
+
+    def save(self):
+        with self.lock:
+            if not self.added:
+                return
+            os.makedirs(self.memo_path.parent, exist_ok=True)
+            tmp = pathlib.Path(str(self.memo_path) + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"taxonomy": self.version, "roles": dict(self.memo)}, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.memo_path)
+            self.added = 0
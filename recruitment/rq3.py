@@ -0,0 +1,95 @@
+import itertools
+
+from recruitment.budget import BudgetExceeded, BudgetGovernor, estimate_rq3, format_estimate, per_call
+from recruitment.clients import make_client
+from recruitment.collect import fingerprint
+from recruitment.config import COUNTRIES, MODELS, N_DATASETS, STORE_PATH, permutations_dir
+from recruitment.prompts import STRUCTURED_SYSTEM_PROMPT, SYSTEM_PROMPT
+from recruitment.recruiter import Recruiter
+from recruitment.rq3_prompts import compile_prompts
+from recruitment.scheduler import run_tasks, with_retries
+from recruitment.store import ResultStore, append_csv, store_rq
+from recruitment.telemetry import labelled, load, stream_savings
+
+CORRECT_ORDER = list(COUNTRIES)
+country_orders = list(itertools.permutations(COUNTRIES, r=5))
+
+
+def order_path(model_name, order, structured=False):
+    return permutations_dir(model_name, structured) / ("_".join(order) + ".csv")
+
+
+def execute(model_name, token=None, correct_order=CORRECT_ORDER, orders=country_orders,
+            concurrency=64, attempts=5, structured=False, max_reasks=0, prompts=None, seed=0,
+            hedge_budget=0.0, budget=None, stream=False):
+    # `concurrency` only bounds the worker threads; the provider's AIMD limiter sets the calls in flight.
+    # `prompts` may be a stream of CompiledPrompt (e.g. rq3_prompts.iter_prompts()); compiled here otherwise.
+    # `budget` holds BudgetGovernor ceilings (max_cost, max_input_tokens, max_output_tokens, max_rpm).
+    if prompts is None:
+        prompts = compile_prompts(orders, correct_order=correct_order, seed=seed)
+        est = estimate_rq3(model_name, structured=structured, prompts=prompts)
+        print(format_estimate(f"RQ3 {model_name}", est))
+    else:
+        # A prompt stream is not read ahead; the governor's per-call estimate comes from the default prompts.
+        est = estimate_rq3(model_name, structured=structured) if budget else None
+    governor = BudgetGovernor(model_name, expected=per_call(est), **budget) if budget else None
+    client = make_client(model_name, token, hedge_budget=hedge_budget, governor=governor,
+                         telemetry_path=STORE_PATH)
+    recruiter = Recruiter(client, structured=structured, max_reasks=max_reasks, stream=stream)
+    store = ResultStore()
+    model = MODELS[model_name]["model"]
+    system = STRUCTURED_SYSTEM_PROMPT if structured else SYSTEM_PROMPT
+    rq = store_rq("RQ3", structured)
+    # Per order: replies that arrived ahead of a missing dataset, and the next dataset the CSV waits for.
+    ready = {tuple(order): {} for order in orders}
+    written = dict.fromkeys(ready, 0)
+
+    def work(p):
+        try:
+            with labelled(rq="RQ3", order="_".join(p.order), dataset=p.dataset+1):
+                reply = with_retries(lambda: recruiter.ask(p.prompt, p.logins), attempts=attempts)
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            # Keep the row so files stay aligned; `recruitment.repair` re-queries it later.
+            print(f"Error on dataset {p.dataset+1} for {p.order}: {e}")
+            reply = f"Error: {e}"
+        return reply
+
+    done = 0
+    total = len(ready) * N_DATASETS
+
+    def on_result(p, reply):
+        nonlocal done
+        key = "_".join(p.order)
+        store.add(rq, model_name, p.dataset+1, p.prompt, reply, p.logins, fingerprint(model, system, p.prompt),
+                  order_key=key)
+        # The order's CSV grows by its contiguous prefix of finished datasets, so row i is always dataset i+1
+        # and a partial file is already usable; the rows are committed to the store before they are written.
+        ready[p.order][p.dataset] = [p.prompt, reply, ",".join(p.logins)]
+        start = written[p.order]
+        rows = []
+        while written[p.order] in ready[p.order]:
+            rows.append(ready[p.order].pop(written[p.order]))
+            written[p.order] += 1
+        if rows:
+            store.flush()
+            append_csv(order_path(model_name, p.order, structured), rows, new=not start)
+        done += 1
+        print(f"Done {p.dataset+1}/{N_DATASETS} for {p.order} ({done}/{total})")
+
+    try:
+        run_tasks(prompts, work, concurrency, on_result)
+    except BudgetExceeded as e:
+        # Unfinished orders keep their written prefix; a later run with a larger budget redoes them.
+        print(f"Stopped: {e}")
+    store.close()
+    if hasattr(client, "limiter"):
+        print(client.limiter.report(model_name))
+    if hasattr(client, "hedges") or hasattr(client, "batches"):
+        print(client.report(model_name))
+    if governor is not None:
+        print(governor.report())
+    if stream:
+        print(stream_savings(load(provider=model_name, rq="RQ3")))
+    return recruiter.stats
@@ -0,0 +1,86 @@
+# Precompiled RQ3 prompts: every location-swapped variant of every group, built once.
+import argparse
+import gzip
+import itertools
+import json
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from recruitment.config import COUNTRIES, N_DATASETS, RQ_DIR, dataset_path
+
+CompiledPrompt = namedtuple("CompiledPrompt", ["order", "dataset", "prompt", "logins", "countries", "shown"])
+
+COMPILED_PATH = RQ_DIR / "RQ3" / "compiled_prompts.jsonl.gz"
+
+
+def load_groups(n_datasets=N_DATASETS):
+    return [pd.read_csv(dataset_path(i+1)) for i in range(n_datasets)]
+
+
+def source_rows(codes, correct_order, orders, rng):
+    # For every order, the row whose location each row receives:
+    # rows of correct_order[i] take the locations of order[i]'s rows, shuffled.
+    slots = [np.flatnonzero(codes == c) for c in correct_order]
+    if len({len(s) for s in slots}) != 1:
+        raise ValueError("Every country needs the same number of profiles in a group")
+    slots = np.stack(slots)                                   # (countries, per_country)
+    pos = {c: k for k, c in enumerate(correct_order)}
+    order_idx = np.array([[pos[c] for c in order] for order in orders])  # (orders, countries)
+    src = rng.permuted(slots[order_idx], axis=2)              # (orders, countries, per_country)
+    source = np.empty((len(orders), len(codes)), dtype=int)
+    source[:, slots.ravel()] = src.reshape(len(orders), -1)
+    return source
+
+
+def compile_group(df, dataset, correct_order, orders, rng):
+    logins = df['login'].astype(str).to_numpy()
+    codes = df['country'].to_numpy()
+    locations = df['location'].astype(str).to_numpy()
+    heads = [f"{n+1}. Login: {login}, Bio: {bio}, Location: "
+             for n, (login, bio) in enumerate(zip(logins, df['bio'].astype(str)))]
+    source = source_rows(codes, correct_order, orders, rng)
+    shown = codes[source]
+    swapped = locations[source]
+    for k, order in enumerate(orders):
+        prompt = "".join(f"{head}{loc}\n" for head, loc in zip(heads, swapped[k]))
+        yield CompiledPrompt(tuple(order), dataset, prompt, list(logins), list(codes), list(shown[k]))
+
+
+def compile_prompts(orders, correct_order=COUNTRIES, seed=0, groups=None):
+    # Dataset-major: every order gets dataset i before any gets dataset i+1, so running the prompts in
+    # this order fills all permutation files evenly.
+    rng = np.random.default_rng(seed)
+    groups = groups if groups is not None else load_groups()
+    per_group = [list(compile_group(df, i, list(correct_order), [tuple(o) for o in orders], rng))
+                 for i, df in enumerate(groups)]
+    return [p for variants in per_group for p in variants]
+
+
+def save_prompts(prompts, path=COMPILED_PATH):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for p in prompts:
+            f.write(json.dumps(p._asdict()) + "\n")
+
+
+def iter_prompts(path=COMPILED_PATH):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            d = json.loads(line)
+            d["order"] = tuple(d["order"])
+            yield CompiledPrompt(**d)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile all RQ3 location-swapped prompts.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=str(COMPILED_PATH))
+    args = parser.parse_args(argv)
+    prompts = compile_prompts(list(itertools.permutations(COUNTRIES, r=5)), seed=args.seed)
+    save_prompts(prompts, args.out)
+    print(f"Saved {len(prompts)} prompts to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
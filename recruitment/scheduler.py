@@ -0,0 +1,46 @@
+import itertools
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from recruitment.budget import BudgetExceeded
+
+
+def with_retries(fn, attempts=5, backoff=1.0, max_sleep=30.0):
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            if attempt == attempts - 1:
+                raise
+            sleep = min(max_sleep, backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"Retry in {sleep:.1f}s due to {e}")
+            time.sleep(sleep)
+
+
+def run_tasks(tasks, work, concurrency, on_result):
+    # Bounded work queue: at most `concurrency` calls in flight, submitted in task order.
+    # `on_result` always runs in the calling thread, so result files need no locking.
+    # Once a call raises BudgetExceeded no new task is submitted, but the calls already in flight are
+    # paid for: their results still go to `on_result` before the exception is raised.
+    tasks = iter(tasks)
+    stopped = None
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = {pool.submit(work, task): task for task in itertools.islice(tasks, concurrency)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                task = pending.pop(fut)
+                try:
+                    result = fut.result()
+                except BudgetExceeded as e:
+                    stopped = stopped or e
+                    continue
+                on_result(task, result)
+                nxt = next(tasks, None) if stopped is None else None
+                if nxt is not None:
+                    pending[pool.submit(work, nxt)] = nxt
+    if stopped is not None:
+        raise stopped
@@ -0,0 +1,99 @@
+# RQ1 by log-probability scoring: one call per dataset gives each candidate's probability of being
+# picked first, from which the probability of being in the team of 6 follows (Plackett-Luce).
+import argparse
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from recruitment.clients import make_client
+from recruitment.config import COUNTRIES, MODELS, N_DATASETS, RQ_DIR, STORE_PATH, dataset_path
+from recruitment.prompts import CANDIDATE_LETTERS, SCORING_SYSTEM_PROMPT, TEAM_SIZE, format_lettered_candidates
+from recruitment.scheduler import run_tasks, with_retries
+from recruitment.telemetry import labelled
+
+# Probability mass given to a candidate missing from the returned top log-probabilities.
+FLOOR = 1e-6
+
+
+def output_path(model_name):
+    return RQ_DIR / "RQ1" / model_name / "selection_probabilities.csv"
+
+
+def first_pick(logprobs, options):
+    p = np.array([math.exp(logprobs[o]) if o in logprobs else FLOOR for o in options])
+    return p / p.sum()
+
+
+def inclusion_probabilities(weights, k=TEAM_SIZE):
+    # Probability that each candidate is among the first k picks when picks are drawn one by one,
+    # without replacement, proportionally to `weights`. Exact, over the 2^n sets of earlier picks.
+    n = len(weights)
+    reach = np.zeros(1 << n)
+    reach[0] = 1.0
+    included = np.zeros(n)
+    for subset in range(1 << n):
+        size = bin(subset).count("1")
+        if not reach[subset] or size >= k:
+            continue
+        rest = [j for j in range(n) if not subset >> j & 1]
+        total = sum(weights[j] for j in rest)
+        for j in rest:
+            p = reach[subset] * weights[j] / total
+            reach[subset | 1 << j] += p
+            included[j] += p
+    return included
+
+
+def execute(model_name, token=None, concurrency=8, attempts=5):
+    client = make_client(model_name, token, telemetry_path=STORE_PATH)
+    if not hasattr(client, "choice_logprobs"):
+        raise RuntimeError(f"{model_name} does not expose token log-probabilities.")
+    groups = [pd.read_csv(dataset_path(i+1)) for i in range(N_DATASETS)]
+
+    def work(i):
+        df = groups[i]
+        options = list(CANDIDATE_LETTERS[:len(df)])
+        messages = [{"role": "system", "content": SCORING_SYSTEM_PROMPT},
+                    {"role": "user", "content": format_lettered_candidates(df)}]
+        with labelled(rq="RQ1-scoring", dataset=i+1):
+            logprobs = with_retries(lambda: client.choice_logprobs(messages, options), attempts=attempts)
+        return first_pick(logprobs, options), len(logprobs)
+
+    rows = []
+
+    def on_result(i, result):
+        p, seen = result
+        df = groups[i]
+        selected = inclusion_probabilities(p)
+        for j, row in df.iterrows():
+            rows.append([i+1, row["login"], row["country"], p[j], selected[j]])
+        if seen < len(df):
+            print(f"Dataset {i+1}: {len(df) - seen} candidates outside the top log-probabilities")
+
+    run_tasks(range(N_DATASETS), work, concurrency, on_result)
+    out = pd.DataFrame(rows, columns=["dataset", "login", "country", "first_pick", "selected"])
+    out = out.sort_values("dataset", kind="stable")
+    os.makedirs(output_path(model_name).parent, exist_ok=True)
+    out.to_csv(output_path(model_name), index=False)
+
+    # Expected picks per country and dataset: the quantity RQ1 estimates by counting 10 samples.
+    expected = out.groupby(["dataset", "country"])["selected"].sum().unstack(fill_value=0.0)
+    print(f"[{model_name}] expected picks per dataset (log-probability scoring, {N_DATASETS} calls)")
+    for c in COUNTRIES:
+        if c in expected:
+            print(f"{c}: mean {expected[c].mean():.3f}, std {expected[c].std():.3f}")
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate RQ1 selection probabilities from token log-probabilities.")
+    parser.add_argument("--model", choices=[m for m in MODELS if MODELS[m]["provider"] != "anthropic"], required=True)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+    execute(args.model, concurrency=args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
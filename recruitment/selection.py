@@ -0,0 +1,62 @@
+# Vectorized pick counting for the analyses: the responses become a boolean (responses x candidates)
+# selection matrix and the candidates a matching matrix of country codes, and the picks per country
+# for every response come out of one bincount.
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from recruitment.logins import load_index
+
+
+def width(rows):
+    return max((len(r) for r in rows), default=0)
+
+
+def selection_matrix(rows, picked):
+    # rows[i] are the candidate logins of response i and picked[i] the logins it picked; shorter rows
+    # are padded with unselected slots. Every (response, login) pair becomes one integer key, so the
+    # matrix is a single np.isin of the candidate keys against the picked keys.
+    lengths = np.array([len(r) for r in rows], dtype=np.intp)
+    sizes = np.array([len(p) for p in picked], dtype=np.intp)
+    out = np.zeros((len(rows), width(rows)), dtype=bool)
+    total = int(lengths.sum())
+    if not total:
+        return out
+    logins = np.fromiter(chain(chain.from_iterable(rows), chain.from_iterable(picked)), dtype=object,
+                         count=total + int(sizes.sum()))
+    codes, uniques = pd.factorize(logins)
+    response = np.repeat(np.arange(len(rows)), lengths)
+    candidates = response * len(uniques) + codes[:total]
+    chosen = np.repeat(np.arange(len(picked)), sizes) * len(uniques) + codes[total:]
+    slot = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    out[response, slot] = np.isin(candidates, chosen)
+    return out
+
+
+def country_matrix(rows, countries, groups=None, case_insensitive=False):
+    # Index into `countries` of each candidate's country, -1 when unknown or not in `countries`.
+    # With `groups`, a login only counts for response i if it belongs to dataset groups[i].
+    index = load_index()
+    position = {c: k for k, c in enumerate(countries)}
+    entries = index.lower if case_insensitive else index.entries
+    codes = {login: (position.get(c.country, -1), c.group) for login, c in entries.items()}
+    out = np.full((len(rows), width(rows)), -1, dtype=np.int8)
+    # Responses to the same dataset share their candidate row, so each distinct row is looked up once.
+    seen = {}
+    for i, row in enumerate(rows):
+        key = (tuple(row), None if groups is None else groups[i])
+        if key not in seen:
+            found = [codes.get(login.strip().lower() if case_insensitive else login, (-1, None)) for login in row]
+            seen[key] = [code if key[1] is None or group == key[1] else -1 for code, group in found]
+        out[i, :len(row)] = seen[key]
+    return out
+
+
+def pick_counts(selected, codes, n_countries):
+    # (responses x countries) number of selected candidates per country.
+    n = selected.shape[0]
+    mask = selected & (codes >= 0)
+    rows = np.nonzero(mask)[0]
+    flat = rows * n_countries + codes[mask]
+    return np.bincount(flat, minlength=n * n_countries).reshape(n, n_countries)
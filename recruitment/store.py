@@ -0,0 +1,212 @@
+# Append-only results store (SQLite in WAL mode) that the collection stages write to; the per-run and
+# per-order CSV files the analyses read are exported from it. Call telemetry is kept in the same file
+# (recruitment/telemetry.py).
+import argparse
+import csv
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+
+from recruitment.config import MODELS, N_DATASETS, STORE_PATH, permutations_dir, run_dir
+from recruitment.parsing import parse_pairs
+from recruitment.recruiter import RESULT_COLUMNS
+
+# rq is "RQ1/RQ2" (shared collection, keyed by run_id) or "RQ3" (keyed by order_key), followed by
+# " structured" for rows collected in structured mode, which are kept apart (see store_rq).
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    rq TEXT NOT NULL,
+    model TEXT NOT NULL,
+    run_id INTEGER NOT NULL DEFAULT 0,
+    order_key TEXT NOT NULL DEFAULT '',
+    dataset_id INTEGER NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    reply TEXT NOT NULL,
+    logins TEXT NOT NULL,
+    picks TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (rq, model, run_id, order_key, dataset_id)
+) WITHOUT ROWID;
+"""
+
+
+def picks(reply, logins):
+    # [[login, role], ...] for the reply lines naming a candidate.
+    candidates = set(logins)
+    return [[login, role] for login, role in parse_pairs(reply) if login in candidates]
+
+
+def write_csv(path, rows):
+    # Same bytes as the pandas-written result files; replaced atomically.
+    path = pathlib.Path(path)
+    os.makedirs(path.parent, exist_ok=True)
+    tmp = pathlib.Path(str(path) + ".tmp")
+    with open(tmp, "w", newline='') as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(RESULT_COLUMNS)
+        writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+def append_csv(path, rows, new=False):
+    # Adds rows in the format of write_csv; `new` starts the file over with the header.
+    path = pathlib.Path(path)
+    os.makedirs(path.parent, exist_ok=True)
+    with open(path, "w" if new else "a", newline='') as f:
+        writer = csv.writer(f, lineterminator="\n")
+        if new:
+            writer.writerow(RESULT_COLUMNS)
+        writer.writerows(rows)
+
+
+class ResultStore:
+    # `add` only buffers; rows reach the database in one transaction per `batch_size` rows or `flush`.
+    def __init__(self, path=STORE_PATH, batch_size=500):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.batch_size = batch_size
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def add(self, rq, model, dataset_id, prompt, reply, logins, prompt_hash, run_id=0, order_key=""):
+        row = (rq, model, run_id, order_key, dataset_id, prompt_hash, prompt, reply, ",".join(logins),
+               json.dumps(picks(reply, logins)), time.time())
+        with self.lock:
+            self.pending.append(row)
+            if len(self.pending) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  self.pending)
+        self.pending = []
+
+    def rows(self, rq, model, run_id=0, order_key=""):
+        self.flush()
+        return self.conn.execute(
+            "SELECT dataset_id, prompt, reply, logins FROM results "
+            "WHERE rq = ? AND model = ? AND run_id = ? AND order_key = ? ORDER BY dataset_id",
+            (rq, model, run_id, order_key)).fetchall()
+
+    def update_reply(self, rq, model, dataset_id, reply, run_id=0, order_key=""):
+        # Replaces a stored reply and its parsed picks (recruitment/repair.py).
+        self.flush()
+        key = (rq, model, run_id, order_key, dataset_id)
+        where = "rq = ? AND model = ? AND run_id = ? AND order_key = ? AND dataset_id = ?"
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN")
+            logins = self.conn.execute(f"SELECT logins FROM results WHERE {where}", key).fetchone()[0]
+            self.conn.execute(f"UPDATE results SET reply = ?, picks = ?, created = ? WHERE {where}",
+                              (reply, json.dumps(picks(reply, logins.split(","))), time.time()) + key)
+
+    def keys(self, rq, model):
+        self.flush()
+        return self.conn.execute(
+            "SELECT run_id, order_key, COUNT(*) FROM results WHERE rq = ? AND model = ? "
+            "GROUP BY run_id, order_key ORDER BY run_id, order_key", (rq, model)).fetchall()
+
+    def export_csv(self, path, rq, model, run_id=0, order_key=""):
+        # Only complete runs/orders are written, so row i of a file is always dataset i+1.
+        rows = self.rows(rq, model, run_id, order_key)
+        if [r[0] for r in rows] != list(range(1, N_DATASETS+1)):
+            return False
+        write_csv(path, [r[1:] for r in rows])
+        return True
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def store_rq(rq, structured=False):
+    return f"{rq} structured" if structured else rq
+
+
+def csv_path(rq, model_name, run_id=0, order_key=""):
+    structured = rq.endswith(" structured")
+    if rq.startswith("RQ3"):
+        return permutations_dir(model_name, structured) / f"{order_key}.csv"
+    return run_dir(model_name, run_id, structured) / MODELS[model_name]["results_file"]
+
+
+def result_paths(rq, model_name):
+    structured = rq.endswith(" structured")
+    if rq.startswith("RQ3"):
+        return sorted(permutations_dir(model_name, structured).glob("*.csv"))
+    return sorted(run_dir(model_name, 1, structured).parent.glob(f"run_*/{MODELS[model_name]['results_file']}"))
+
+
+def csv_key(rq, path):
+    # (run_id, order_key) of a result file.
+    if rq.startswith("RQ3"):
+        return 0, path.stem
+    return int(path.parent.name.split("_")[1]), ""
+
+
+def export_all(store, rq, model_name):
+    written = skipped = 0
+    for run_id, order_key, count in store.keys(rq, model_name):
+        if store.export_csv(csv_path(rq, model_name, run_id, order_key), rq, model_name, run_id, order_key):
+            written += 1
+        else:
+            skipped += 1
+            print(f"{rq} {model_name} {order_key or f'run_{run_id:02d}'}: {count}/{N_DATASETS} rows, not exported")
+    print(f"[{rq} {model_name}] exported {written} result files ({skipped} incomplete)")
+    return written
+
+
+def import_csvs(store, rq, model_name, missing_only=False):
+    # Loads existing result files into the store, hashing their prompts with the system prompt of their mode.
+    # With `missing_only`, runs/orders the store already has are left as they are.
+    from recruitment.collect import fingerprint
+    from recruitment.prompts import STRUCTURED_SYSTEM_PROMPT, SYSTEM_PROMPT
+    model = MODELS[model_name]["model"]
+    system = STRUCTURED_SYSTEM_PROMPT if rq.endswith(" structured") else SYSTEM_PROMPT
+    have = {(run_id, order_key) for run_id, order_key, _ in store.keys(rq, model_name)} if missing_only else set()
+    paths = [p for p in result_paths(rq, model_name) if csv_key(rq, p) not in have]
+    for path in paths:
+        run_id, order_key = csv_key(rq, path)
+        with open(path, newline='') as f:
+            for i, row in enumerate(csv.DictReader(f)):
+                logins = row["login"].split(",")
+                store.add(rq, model_name, i+1, row["Candidate list"], row["Recruit"], logins,
+                          fingerprint(model, system, row["Candidate list"]), run_id, order_key)
+    store.flush()
+    print(f"[{rq} {model_name}] imported {len(paths)} result files")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move results between the results store and the CSV files.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("--rq", choices=["RQ1", "RQ2", "RQ3"], required=True)
+    parser.add_argument("--model", choices=list(MODELS), required=True)
+    parser.add_argument("--structured", action="store_true", help="the structured-mode results")
+    parser.add_argument("--store", default=str(STORE_PATH))
+    args = parser.parse_args(argv)
+    store = ResultStore(args.store)
+    rq = store_rq("RQ3" if args.rq == "RQ3" else "RQ1/RQ2", args.structured)
+    if args.command == "export":
+        export_all(store, rq, args.model)
+    else:
+        import_csvs(store, rq, args.model)
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
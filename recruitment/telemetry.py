@@ -0,0 +1,219 @@
+# Per-call telemetry (timing, tokens, stop reason, retries) stored in the `telemetry` table of the results store.
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from recruitment.config import STORE_PATH
+
+LOCAL = threading.local()
+
+# One row per HTTP request; `record` holds all its fields as JSON, provider and rq are copied out for filtering.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS telemetry (
+    provider TEXT,
+    rq TEXT,
+    start REAL NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS telemetry_provider ON telemetry (provider, rq);
+"""
+
+
+def current_labels():
+    return dict(getattr(LOCAL, "labels", {}))
+
+
+@contextmanager
+def labelled(**labels):
+    # Labels (rq, run_id, order, dataset, retry, ...) attached to every call made in this thread.
+    previous = current_labels()
+    LOCAL.labels = {**previous, **labels}
+    try:
+        yield
+    finally:
+        LOCAL.labels = previous
+
+
+def carry(fn):
+    # Runs `fn` in another thread with the labels of the thread that created the wrapper.
+    labels = current_labels()
+
+    def wrapper(*args, **kwargs):
+        with labelled(**labels):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def mark_first_byte(elapsed=None):
+    # Called by the HTTP response hooks when the response headers arrive.
+    start = getattr(LOCAL, "request_start", None)
+    if start is not None and getattr(LOCAL, "first_byte", None) is None:
+        LOCAL.first_byte = elapsed if elapsed is not None else time.time() - start
+
+
+def hooked_requests_session():
+    # openai<1 sends requests through `requests`; the response hook runs once the headers are in.
+    import requests
+    session = requests.Session()
+    session.hooks["response"].append(lambda r, *args, **kwargs: mark_first_byte(r.elapsed.total_seconds()))
+    return session
+
+
+def connect(path=STORE_PATH):
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=60, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class Telemetry:
+    def __init__(self, path=STORE_PATH, provider=None):
+        self.path = str(path)
+        self.provider = provider
+        self.conn = connect(self.path)
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def call(self, **fields):
+        # Times one HTTP request; the caller fills `record` with usage/stop reason from the response.
+        record = {"provider": self.provider, **current_labels(), **fields}
+        LOCAL.first_byte = None
+        LOCAL.request_start = record["start"] = time.time()
+        try:
+            yield record
+            record.setdefault("status", "ok")
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = type(e).__name__
+            record["http_status"] = getattr(e, "status_code", None) or getattr(e, "http_status", None)
+            raise
+        finally:
+            record["end"] = time.time()
+            record["latency"] = record["end"] - record["start"]
+            record["ttfb"] = getattr(LOCAL, "first_byte", None)
+            LOCAL.request_start = None
+            self.write(record)
+
+    def write(self, record):
+        row = (record.get("provider"), record.get("rq"), record["start"], json.dumps(record, default=str))
+        with self.lock:
+            self.conn.execute("INSERT INTO telemetry VALUES (?, ?, ?, ?)", row)
+
+
+def load(path=STORE_PATH, provider=None, rq=None):
+    # Records of the store, optionally of one provider (model name) and/or rq label only.
+    if not os.path.exists(str(path)):
+        return []
+    query, args = "SELECT record FROM telemetry WHERE 1", []
+    if provider is not None:
+        query += " AND provider = ?"
+        args.append(provider)
+    if rq is not None:
+        query += " AND rq = ?"
+        args.append(rq)
+    conn = connect(path)
+    try:
+        return [json.loads(r[0]) for r in conn.execute(query + " ORDER BY start", args)]
+    finally:
+        conn.close()
+
+
+def load_jsonl(paths):
+    # telemetry.jsonl files written before telemetry moved into the results store.
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return records
+
+
+def quantile(values, q):
+    if not values:
+        return float("nan")
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q * 100) - 1]
+
+
+def summarize(records):
+    groups = defaultdict(list)
+    for r in records:
+        groups[(r.get("provider"), r.get("rq"))].append(r)
+    lines = []
+    for (provider, rq), rows in sorted(groups.items(), key=lambda kv: (str(kv[0][0]), str(kv[0][1]))):
+        ok = [r for r in rows if r.get("status") == "ok"]
+        latencies = [r["latency"] for r in ok]
+        ttfb = [r["ttfb"] for r in ok if r.get("ttfb") is not None]
+        span = max(r["end"] for r in rows) - min(r["start"] for r in rows)
+        tokens_in = sum(r.get("input_tokens") or 0 for r in ok)
+        tokens_out = sum(r.get("output_tokens") or 0 for r in ok)
+        cached = sum(r.get("cached_tokens") or 0 for r in ok)
+        lines += [
+            f"[{provider} {rq}]",
+            f"requests: {len(rows)} ({len(rows) - len(ok)} errors, "
+            f"{sum(1 for r in rows if r.get('retry'))} retries)",
+            f"latency p50/p95/p99: {quantile(latencies, .5):.2f}s / {quantile(latencies, .95):.2f}s / "
+            f"{quantile(latencies, .99):.2f}s",
+            f"time to first byte p50: {quantile(ttfb, .5):.2f}s" if ttfb else "time to first byte: n/a",
+            f"throughput: {len(ok) / span if span > 0 else float('nan'):.2f} req/s over {span:.0f}s",
+            f"tokens in/out: {tokens_in} / {tokens_out} (cached input tokens: {cached})",
+            f"models: {', '.join(sorted({str(r.get('model_version')) for r in ok}))}",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def stream_savings(records):
+    # Early-stopped streamed calls against the provider's non-streamed calls (the baseline).
+    lines = []
+    providers = sorted({str(r.get("provider")) for r in records if r.get("streamed")})
+    for provider in providers:
+        ok = [r for r in records if str(r.get("provider")) == provider and r.get("status") == "ok"]
+        streamed = [r for r in ok if r.get("streamed")]
+        baseline = [r for r in ok if not r.get("streamed") and not r.get("n", 1) > 1 and r.get("output_tokens")]
+        stopped = sum(1 for r in streamed if r.get("early_stop"))
+        lines.append(f"[{provider} streaming] {len(streamed)} streamed calls, {stopped} stopped after six valid picks")
+        if not baseline:
+            lines.append("no non-streamed calls to compare with")
+            continue
+        base_tokens = statistics.mean(r["output_tokens"] for r in baseline)
+        base_latency = statistics.mean(r["latency"] for r in baseline)
+        tokens = statistics.mean(r.get("output_tokens") or 0 for r in streamed)
+        latency = statistics.mean(r["latency"] for r in streamed)
+        lines += [
+            f"output tokens per call: {tokens:.1f} vs {base_tokens:.1f} non-streamed "
+            f"(saved ~{(base_tokens - tokens) * len(streamed):.0f} tokens)",
+            f"latency per call: {latency:.2f}s vs {base_latency:.2f}s non-streamed "
+            f"(saved ~{(base_latency - latency) * len(streamed):.0f}s of call time)",
+        ]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize recruiter call telemetry.")
+    parser.add_argument("paths", nargs="*", help="older telemetry.jsonl files to read instead of the results store")
+    parser.add_argument("--store", default=str(STORE_PATH))
+    parser.add_argument("--model", help="only this model's calls")
+    parser.add_argument("--rq", help="only calls with this rq label, e.g. RQ1/RQ2 or RQ3")
+    parser.add_argument("--out", help="also write the report to this file")
+    args = parser.parse_args(argv)
+    records = load_jsonl(args.paths) if args.paths else load(args.store, args.model, args.rq)
+    report = summarize(records)
+    if any(r.get("streamed") for r in records):
+        report += "\n" + stream_savings(records) + "\n"
+    print(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# Shared task queue for running the recruiter calls from several worker processes or hosts.
+# The queue is one SQLite file (on a shared filesystem for several hosts): tasks are leased with a
+# timeout that running workers keep extending, and a reply is only accepted from the lease holder.
+import argparse
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from recruitment.clients import make_client
+from recruitment.collect import fingerprint, stored_rows
+from recruitment.config import MODELS, N_DATASETS, RQ_DIR, STORE_PATH, dataset_path, run_dir
+from recruitment.prompts import STRUCTURED_SYSTEM_PROMPT, SYSTEM_PROMPT, format_candidates
+from recruitment.recruiter import Recruiter
+from recruitment.scheduler import run_tasks, with_retries
+from recruitment.store import ResultStore, csv_path, store_rq
+from recruitment.telemetry import labelled
+
+QUEUE_PATH = RQ_DIR / "queue.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    rq TEXT NOT NULL,
+    model TEXT NOT NULL,
+    run TEXT NOT NULL,
+    dataset INTEGER NOT NULL,
+    structured INTEGER NOT NULL DEFAULT 0,
+    prompt TEXT NOT NULL,
+    logins TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    reply TEXT,
+    finished REAL,
+    UNIQUE (rq, model, run, dataset)
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, lease_until);
+"""
+
+
+def connect(path=QUEUE_PATH):
+    # Rollback journal rather than WAL: WAL needs shared memory, which network filesystems lack.
+    conn = sqlite3.connect(str(path), timeout=120, isolation_level=None, check_same_thread=False)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def enqueue_collect(conn, model_name, repeats=10, structured=False):
+    # RQ1/RQ2 tasks for run_01..run_NN; rows already stored with the same prompt fingerprint are
+    # entered as done, so only the missing calls are made.
+    spec = MODELS[model_name]
+    system = STRUCTURED_SYSTEM_PROMPT if structured else SYSTEM_PROMPT
+    key = store_rq("RQ1/RQ2", structured)
+    groups = [pd.read_csv(dataset_path(i+1)) for i in range(N_DATASETS)]
+    rows = []
+    for rep in range(1, repeats+1):
+        run = f"run_{rep:02d}"
+        stored = stored_rows(run_dir(model_name, rep, structured) / spec["results_file"], spec["model"], system)
+        for i, df in enumerate(groups):
+            prompt = format_candidates(df)
+            logins = ",".join(df['login'].tolist())
+            row = stored.get(fingerprint(spec["model"], system, prompt))
+            if row is not None:
+                rows.append((key, model_name, run, i+1, int(structured), row["Candidate list"], row["login"],
+                             "done", row["Recruit"]))
+            else:
+                rows.append((key, model_name, run, i+1, int(structured), prompt, logins, "pending", None))
+    return insert(conn, rows)
+
+
+def enqueue_rq3(conn, model_name, structured=False, seed=0):
+    from recruitment.rq3 import country_orders
+    from recruitment.rq3_prompts import compile_prompts
+    rows = [(store_rq("RQ3", structured), model_name, "_".join(p.order), p.dataset+1, int(structured), p.prompt, ",".join(p.logins),
+             "pending", None) for p in compile_prompts(country_orders, seed=seed)]
+    return insert(conn, rows)
+
+
+def insert(conn, rows):
+    # Tasks already in the queue are left as they are, so enqueueing twice is harmless.
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        before = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        conn.executemany(
+            "INSERT OR IGNORE INTO tasks (rq, model, run, dataset, structured, prompt, logins, state, reply) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] - before
+
+
+def lease(conn, owner, limit, ttl):
+    # Pending tasks and tasks whose lease expired (their worker died or stalled), oldest first.
+    now = time.time()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        tasks = conn.execute(
+            "SELECT id, rq, model, run, dataset, structured, prompt, logins FROM tasks "
+            "WHERE state = 'pending' OR (state = 'leased' AND lease_until < ?) ORDER BY id LIMIT ?",
+            (now, limit)).fetchall()
+        conn.executemany(
+            "UPDATE tasks SET state = 'leased', owner = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+            [(owner, now + ttl, t[0]) for t in tasks])
+    return tasks
+
+
+def heartbeat(conn, owner, ttl):
+    with conn:
+        conn.execute("UPDATE tasks SET lease_until = ? WHERE state = 'leased' AND owner = ?", (time.time() + ttl, owner))
+
+
+def complete(conn, task_id, owner, reply):
+    # False when the lease was lost meanwhile: another worker owns the task and its reply counts.
+    with conn:
+        cur = conn.execute(
+            "UPDATE tasks SET state = 'done', reply = ?, finished = ?, owner = NULL, lease_until = NULL "
+            "WHERE id = ? AND owner = ? AND state = 'leased'", (reply, time.time(), task_id, owner))
+    return cur.rowcount == 1
+
+
+def release(conn, task_id, owner):
+    with conn:
+        conn.execute("UPDATE tasks SET state = 'pending', owner = NULL, lease_until = NULL "
+                     "WHERE id = ? AND owner = ? AND state = 'leased'", (task_id, owner))
+
+
+def counts(conn):
+    return dict(conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall())
+
+
+def work(path=QUEUE_PATH, concurrency=16, ttl=120, attempts=5, max_task_attempts=3, token=None):
+    # Leases up to `concurrency` tasks at a time and runs them on the usual bounded work queue.
+    # Runs until no task is pending or leased by another worker.
+    conn = connect(path)
+    lock = threading.Lock()
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    recruiters = {}
+    recruiters_lock = threading.Lock()
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(ttl / 3):
+            with lock:
+                heartbeat(conn, owner, ttl)
+    threading.Thread(target=beat, daemon=True).start()
+
+    def recruiter(rq, model_name, structured):
+        key = (rq, model_name, structured)
+        with recruiters_lock:
+            if key not in recruiters:
+                client = make_client(model_name, token, telemetry_path=STORE_PATH)
+                recruiters[key] = Recruiter(client, structured=bool(structured))
+            return recruiters[key]
+
+    def call(task):
+        task_id, rq, model_name, run, dataset, structured, prompt, logins = task
+        rec = recruiter(rq, model_name, structured)
+        try:
+            with labelled(rq=rq, run=run, dataset=dataset, worker=owner):
+                return with_retries(lambda: rec.ask(prompt, logins.split(",")), attempts=attempts)
+        except Exception as e:
+            print(f"Error on {rq} {model_name} {run} dataset {dataset}: {e}")
+            return None
+
+    done = lost = 0
+    try:
+        while True:
+            with lock:
+                tasks = lease(conn, owner, concurrency, ttl)
+            if not tasks:
+                with lock:
+                    state = counts(conn)
+                if not state.get("leased"):
+                    break
+                time.sleep(min(ttl, 10))
+                continue
+
+            def on_result(task, reply):
+                nonlocal done, lost
+                with lock:
+                    if reply is None:
+                        # Errors go back to the queue; after `max_task_attempts` leases the Error row is kept.
+                        tries = conn.execute("SELECT attempts FROM tasks WHERE id = ?", (task[0],)).fetchone()[0]
+                        if tries < max_task_attempts:
+                            release(conn, task[0], owner)
+                            return
+                        reply = "Error: no valid response"
+                    if complete(conn, task[0], owner, reply):
+                        done += 1
+                    else:
+                        lost += 1
+
+            run_tasks(tasks, call, concurrency, on_result)
+            print(f"[{owner}] {done} tasks done, {lost} replies discarded (lease lost), queue: {counts(conn)}")
+    finally:
+        stop.set()
+    return done
+
+
+def export(rq, model_name, path=QUEUE_PATH, structured=False, store_path=STORE_PATH):
+    # Finished tasks go into the results store, and the complete runs/orders are exported from it to the
+    # result files the analyses read, in dataset order; the others are reported and left untouched.
+    conn = connect(path)
+    key = store_rq("RQ3" if rq == "RQ3" else "RQ1/RQ2", structured)
+    tasks = conn.execute(
+        "SELECT run, dataset, state, prompt, reply, logins FROM tasks WHERE rq = ? AND model = ? "
+        "ORDER BY run, dataset", (key, model_name)).fetchall()
+    by_run = {}
+    for t in tasks:
+        by_run.setdefault(t[0], []).append(t)
+    model = MODELS[model_name]["model"]
+    system = STRUCTURED_SYSTEM_PROMPT if structured else SYSTEM_PROMPT
+    store = ResultStore(store_path)
+    written = 0
+    for run, rows in by_run.items():
+        run_id, order_key = (0, run) if rq == "RQ3" else (int(run.split("_")[1]), "")
+        for _, dataset, state, prompt, reply, logins in rows:
+            if state == "done":
+                store.add(key, model_name, dataset, prompt, reply, logins.split(","),
+                          fingerprint(model, system, prompt), run_id, order_key)
+        if len(rows) != N_DATASETS or any(r[2] != "done" for r in rows):
+            print(f"{key} {model_name} {run}: {sum(r[2] == 'done' for r in rows)}/{N_DATASETS} done, not exported")
+            continue
+        if store.export_csv(csv_path(key, model_name, run_id, order_key), key, model_name, run_id, order_key):
+            written += 1
+    store.close()
+    print(f"[{key} {model_name}] exported {written} of {len(by_run)} runs")
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run recruiter calls through a shared SQLite task queue.")
+    parser.add_argument("--queue", default=str(QUEUE_PATH), help="queue file, on a shared filesystem for several hosts")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("enqueue")
+    p.add_argument("--rq", choices=["RQ1", "RQ2", "RQ3"], required=True)
+    p.add_argument("--model", choices=list(MODELS), required=True)
+    p.add_argument("--repeats", type=int, default=10)
+    p.add_argument("--structured", action="store_true")
+    p = sub.add_parser("work")
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--ttl", type=float, default=120, help="lease timeout in seconds")
+    p = sub.add_parser("status")
+    p = sub.add_parser("export")
+    p.add_argument("--rq", choices=["RQ1", "RQ2", "RQ3"], required=True)
+    p.add_argument("--model", choices=list(MODELS), required=True)
+    p.add_argument("--structured", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "enqueue":
+        conn = connect(args.queue)
+        if args.rq == "RQ3":
+            added = enqueue_rq3(conn, args.model, structured=args.structured)
+        else:
+            added = enqueue_collect(conn, args.model, repeats=args.repeats, structured=args.structured)
+        print(f"{added} tasks added, queue: {counts(conn)}")
+    elif args.command == "work":
+        work(args.queue, concurrency=args.concurrency, ttl=args.ttl)
+    elif args.command == "status":
+        conn = connect(args.queue)
+        print(counts(conn))
+        for row in conn.execute("SELECT rq, model, state, COUNT(*) FROM tasks GROUP BY rq, model, state"):
+            print(*row)
+    else:
+        export(args.rq, args.model, args.queue, structured=args.structured)
+
+
+if __name__ == "__main__":
+    main()